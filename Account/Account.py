@@ -1,16 +1,29 @@
 """This file is for handling the account page."""
 # IMPORTS
-import atexit
 from datetime import datetime
-import socket
-import requests
 
+from kivy.app import App
 from kivy.properties import ObjectProperty, BooleanProperty
 from kivy.uix.screenmanager import Screen
 
+from Backend.Client import device_ip
+
 
 class AccountScreen(Screen):
-    """This class manipulates the account screen defined in account.kv"""
+    """
+    This class manipulates the account screen defined in account.kv
+
+    Attributes
+    ----------
+    store: LocalStore
+          The data on the device, which the sign out is queued in. It is kept here as the app is
+          no longer running by the time the last sign out is sent, see WindowManagerApp.on_stop().
+    user: Dictionary
+          The signed in user's details, as the backend sent them when they signed in. They are
+          kept in memory only, as they include the user's password.
+    score_record: Dictionary
+          The signed in user's score record, kept in step with the backend's.
+    """
     username = ObjectProperty(None)
     high_score = ObjectProperty(None)
     most_days = ObjectProperty(None)
@@ -20,54 +33,101 @@ class AccountScreen(Screen):
 
     def __init__(self, **kwargs):
         Screen.__init__(self, **kwargs)
-        atexit.register(self.sign_out)
+        self.store = App.get_running_app().store
+        self.user = None
+        self.score_record = None
+
+    def set_score(self, score):
+        """
+        This function places the user's score record in the account screen.
+
+        :param score: the user's score record, as returned by the backend
+        """
+        self.score_record = dict(score)
+        self.store.put("scores", self.score_record)
+        self.username = score["score_username"]
+        self.high_score = score["high_score"]
+        self.most_days = score["most_days_lasted"]
+        self.previous_score = score["previous_score"]
+        self.previous_days = score["previous_days_lasted"]
+
+        self.manager.game.load_player(self.username)
+
+    def record_game(self, score, days, date_achieved):
+        """
+        This function merges a finished game into the user's score record.
+
+        :param score: the game's score
+        :param days: the number of days the game lasted
+        :param date_achieved: when the game ended
+
+        :return updated_score: the updated score record, to be sent to the backend
+        """
+        updated_score = dict(self.score_record)
+
+        if score >= updated_score["high_score"]:
+            updated_score["high_score"] = score
+            updated_score["date_achieved"] = str(date_achieved)
+
+        updated_score["previous_score"] = score
+        updated_score["most_days_lasted"] = max(days, updated_score["most_days_lasted"])
+        updated_score["previous_days_lasted"] = days
+
+        self.set_score(updated_score)
+        return updated_score
 
     def sign_out(self):
-        """This function signs the user out."""
-        if self.username is not None or self.username != "":
-            current_user = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username}/user').json()
-
-            updated_user = {
-                "username": current_user["username"],
-                "role": current_user["role"],
-                "email": current_user["email"],
-                "password": current_user["password"],
-                "registered_on": current_user["registered_on"],
-                "last_logged_in": datetime.now(),
-                "logged_in": False,
-                "allow_emails": current_user["allow_emails"]
-            }
-
-            requests.put(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username}/update/user', data=updated_user).json()
-
-            hostname = socket.gethostname()
-            if current_user["role"] == "user":
+        """This function signs the user out. The changes are sent to the server in the background."""
+        if self.username:
+            current_user = self.user
+
+            if current_user is not None:
+                updated_user = {
+                    "username": current_user["username"],
+                    "role": current_user["role"],
+                    "email": current_user["email"],
+                    "password": current_user["password"],
+                    "registered_on": current_user["registered_on"],
+                    "last_logged_in": datetime.now(),
+                    "logged_in": False,
+                    "allow_emails": current_user["allow_emails"]
+                }
+
+                self.store.update_user(self.username, updated_user)
+
+            if current_user is None or current_user["role"] == "user":
                 new_log = {
                     "username": self.username,
                     "time_occurred": datetime.now(),
                     "warning_desc": "user sign out",
-                    "ip": socket.gethostbyname(hostname)
+                    "ip": device_ip()
                 }
             else:
                 new_log = {
                     "username": self.username,
                     "time_occurred": datetime.now(),
                     "warning_desc": "admin sign out",
-                    "ip": socket.gethostbyname(hostname)
+                    "ip": device_ip()
                 }
 
-            requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/log', data=new_log)
+            self.store.create_log(new_log)
+            # Only the admin's screens download the logs
+            self.store.forget("logs")
 
+            self.user = None
+            self.score_record = None
             self.username = ""
             self.high_score = ""
             self.most_days = ""
             self.previous_score = ""
             self.previous_days = ""
 
-            self.manager.game.reset_game()
+            self.manager.game.unload_player()
 
     def switch_emails(self):
-        current_user = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username}/user').json()
+        current_user = self.user
+        if current_user is None:
+            return
 
         if current_user["allow_emails"]:
             allow = False
@@ -85,6 +145,5 @@ class AccountScreen(Screen):
             "allow_emails": allow
         }
 
-        requests.put(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username}/update/user', data=updated_user).json()
-
-        atexit.register(self.sign_out)
+        self.user = updated_user
+        self.store.update_user(self.username, updated_user)
@@ -1,8 +1,8 @@
 """The game's scoreboard. Here is ranked every player based on their high score."""
 
 # IMPORTS
-import requests
-
+from kivy.app import App
+from kivy.clock import mainthread
 from kivy.uix.screenmanager import Screen
 
 
@@ -17,8 +17,8 @@ class RV(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # Get the scores table
-        scores = requests.get("https://no2project.herokuapp.com/backend_api/no2_backend/scores").json()
+        # Get the scores table, as last downloaded
+        scores = App.get_running_app().store.rows("scores")
 
         # Leave only usernames, high scores and dates from users who have played before
         self.usernames = []
@@ -102,14 +102,24 @@ class RV(Screen):
 
 
 class Scoreboard(Screen):
-    """This class builds the scoreboard on screen."""
+    """
+    This class builds the scoreboard on screen. It shows the scores on the device straight away
+    and is rebuilt whenever newer scores are downloaded.
+    """
     def __init__(self, **kwargs):
         Screen.__init__(self, **kwargs)
         self.rv = RV()
         self.add_widget(self.rv)
+        App.get_running_app().store.subscribe("scores", self.rebuild)
 
     def refresh_scoreboard(self):
-        """This function refreshes the scoreboard."""
+        """This function refreshes the scoreboard and keeps downloading the latest scores while it is shown."""
+        self.rebuild()
+        App.get_running_app().store.watch("scores")
+
+    @mainthread
+    def rebuild(self, *args):
+        """This function rebuilds the scoreboard from the scores on the device."""
         self.remove_widget(self.rv)
         self.rv = RV()
         self.add_widget(self.rv)
@@ -1,9 +1,8 @@
 """The screen that contains all of the admins' functions"""
 
 # IMPORTS
-import atexit
-import requests
-
+from kivy.app import App
+from kivy.clock import mainthread
 from kivy.uix.screenmanager import Screen
 from kivy.properties import ObjectProperty
 from kivy.uix.recycleview import RecycleView
@@ -12,8 +11,7 @@ from kivy.uix.boxlayout import BoxLayout
 
 class AdminScreen(Screen):
     """AdminScreen class declaration, defined inside admin.kv"""
-    def sign_admin_out(self):
-        atexit.register(self.manager.account_screen.sign_out)
+    pass
 
 
 class Entry(BoxLayout):
@@ -25,12 +23,19 @@ class Log(RecycleView):
     """Log class to show the log entries to the  Admin"""
     def __init__(self,**kwargs):
         super(Log, self).__init__(**kwargs)
-        # Fills the log when the screen is created
-        self.refresh_log()
+        # Fills the log when the screen is created, and again whenever newer entries are downloaded
+        self.show_log()
+        App.get_running_app().store.subscribe("logs", self.show_log)
 
     def refresh_log(self):
-        # Gets log entries from the database
-        items = requests.get('https://no2project.herokuapp.com/backend_api/no2_backend/logs').json()
+        # Shows the entries on the device and keeps downloading the latest ones while the screen is open
+        self.show_log()
+        App.get_running_app().store.watch("logs")
+
+    @mainthread
+    def show_log(self, *args):
+        # Gets log entries from the device
+        items = App.get_running_app().store.rows("logs")
         # Reverses the order so more recent entries are displayed first
         items.reverse()
         self.data = [{'username': x['username'],
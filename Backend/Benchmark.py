@@ -0,0 +1,248 @@
+"""
+Measures what each of the app's flows costs on the network, against the local stand-in in
+MockServer.py.
+
+Each flow sends the requests the app sends for it, through the same client, whether the screen
+waits for them or the local store sends them in the background:
+
+    login        logging in, then anything the server did not record itself
+    register     registering, then anything the server did not record itself
+    game over    sending a finished game's score record with its replay, which is verified
+    scoreboard   downloading every score record
+    news         downloading every news article
+    logs         downloading every log entry
+
+Every flow is run a number of times by several clients at once, and the requests, the bytes
+sent and received and the wall time of each run are reported. Latency and failures can be
+injected, to see what a slow or unreliable network costs. Run it from the root directory:
+
+    python -m Backend.Benchmark
+    python -m Backend.Benchmark --latency 0.08 --jitter 0.04 --error-rate 0.05 --clients 8
+"""
+
+# IMPORTS
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import base64
+import statistics
+import time
+import requests
+
+from Backend.Client import BackendClient
+from Backend.MockServer import BackendHandler, seed, start
+from Game.Balance import script_game
+from Game.Engine import Engine
+
+
+# The device address sent with the log entries
+IP = "127.0.0.1"
+
+
+class Flows:
+    """
+    This class runs the app's flows against the stand-in.
+
+    Attributes
+    ----------
+    client: BackendClient
+          The client every flow is sent through, shared by the benchmark's clients like it is
+          by the app's screens.
+    users: Integer
+          The number of users the stand-in was seeded with.
+    games: List
+          Finished games to send on game over, each a tuple of the encoded replay, the step it
+          ended in, its score and the number of days it lasted.
+    """
+    def __init__(self, client, users, games):
+        self.client = client
+        self.users = users
+        self.games = games
+
+    def login(self, n):
+        """
+        This function logs a seeded user in.
+
+        :param n: the number of the run
+        """
+        player = n % self.users
+        result = self.client.login({"username": f"player{player}", "password": f"password!{player}"}, IP)
+        if not result["logged"]:
+            user = result["user"]
+            self.client.update_user(user["username"], dict(user, logged_in=True))
+            self.client.create_log({"username": user["username"], "time_occurred": datetime.now(),
+                                    "warning_desc": "user login", "ip": IP})
+
+    def register(self, n):
+        """
+        This function registers a new user.
+
+        :param n: the number of the run
+        """
+        username = f"new{n}x{time.monotonic_ns()}"
+        user = {
+            "username": username,
+            "role": "user",
+            "email": f"{username}@example.com",
+            "password": "password!",
+            "registered_on": datetime.now(),
+            "last_logged_in": datetime.now(),
+            "logged_in": True,
+            "allow_emails": True
+        }
+        score = {
+            "score_username": username,
+            "high_score": 0,
+            "date_achieved": datetime(2000, 1, 1),
+            "previous_score": 0,
+            "most_days_lasted": 0,
+            "previous_days_lasted": 0
+        }
+        result = self.client.register(user, score, IP)
+        if not result["logged"]:
+            self.client.create_log({"username": username, "time_occurred": datetime.now(),
+                                    "warning_desc": "user registration and login", "ip": IP})
+
+    def game_over(self, n):
+        """
+        This function sends a finished game's score record, as the local store does.
+
+        :param n: the number of the run
+        """
+        replay, steps, score, days = self.games[n % len(self.games)]
+        record = {
+            "score_username": f"player{n % self.users}",
+            "high_score": score,
+            "date_achieved": str(datetime.now()),
+            "previous_score": score,
+            "most_days_lasted": days,
+            "previous_days_lasted": days
+        }
+        self.client.update_score(record["score_username"],
+                                 dict(record, replay=base64.b64encode(replay).decode(), steps=steps))
+
+    def scoreboard(self, n):
+        """This function downloads every score record, as the scoreboard does."""
+        self.client.scores()
+
+    def news(self, n):
+        """This function downloads every news article, as the news page does."""
+        self.client.articles()
+
+    def logs(self, n):
+        """This function downloads every log entry, as the admin's log page does."""
+        self.client.logs()
+
+
+def record_games(count):
+    """
+    This function records games played by the balancing harness's scripted player.
+
+    :param count: the number of games
+
+    :return: the games, as Flows.games
+    """
+    games = []
+    for n in range(count):
+        engine = Engine(seed=n)
+        script_game(engine, n, 10000, 5)
+        games.append((engine.events.to_bytes(), engine.scheduler.steps, engine.state.score, engine.state.days))
+    return games
+
+
+def run_flow(flow, runs, clients):
+    """
+    This function runs a flow a number of times, by several clients at once.
+
+    :param flow: the flow, one of Flows' functions
+    :param runs: the number of times to run it
+    :param clients: the number of clients running it at the same time
+
+    :return: the wall time of every run that succeeded, the number of runs that failed and
+             the wall time of the whole flow
+    """
+    def timed(n):
+        start_time = time.perf_counter()
+        try:
+            flow(n)
+        except requests.RequestException:
+            return None
+        return time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        times = list(pool.map(timed, range(runs)))
+    elapsed = time.perf_counter() - start_time
+
+    succeeded = [duration for duration in times if duration is not None]
+    return succeeded, runs - len(succeeded), elapsed
+
+
+def benchmark(runs, clients, composites, users):
+    """
+    This function runs every flow and prints what each costs per run.
+
+    :param runs: the number of times to run each flow
+    :param clients: the number of clients running each flow at the same time
+    :param composites: False to send the individual requests instead of the composite ones
+    :param users: the number of users to seed the stand-in with
+    """
+    games = record_games(4)
+    seed(users, 30, 1000)
+
+    # Seeding and recording are not measured
+    failures = BackendHandler.error_rate, BackendHandler.drop_rate
+    BackendHandler.error_rate = BackendHandler.drop_rate = 0
+    server = start(0)
+    client = BackendClient(f"http://127.0.0.1:{server.server_address[1]}/backend_api")
+    client.composites = composites
+    client.health()
+    BackendHandler.error_rate, BackendHandler.drop_rate = failures
+
+    flows = Flows(client, users, games)
+    print(f"{runs} runs of each flow by {clients} clients, latency {BackendHandler.latency * 1000:.0f} ms "
+          f"+ up to {BackendHandler.jitter * 1000:.0f} ms, {BackendHandler.error_rate:.0%} errors, "
+          f"{BackendHandler.drop_rate:.0%} dropped, {'composite' if composites else 'single'} endpoints")
+    print(f"{'flow':<12}{'failed':>8}{'requests':>10}{'sent':>10}{'received':>10}"
+          f"{'mean ms':>10}{'p95 ms':>10}{'runs/s':>10}")
+
+    for name in ("login", "register", "game_over", "scoreboard", "news", "logs"):
+        BackendHandler.reset()
+        succeeded, failed, elapsed = run_flow(getattr(flows, name), runs, clients)
+        traffic = BackendHandler.reset()
+
+        if succeeded:
+            mean = statistics.mean(succeeded) * 1000
+            p95 = sorted(succeeded)[int(0.95 * (len(succeeded) - 1))] * 1000
+        else:
+            mean = p95 = float("nan")
+        print(f"{name.replace('_', ' '):<12}{failed:>8}{traffic['requests'] / runs:>10.1f}"
+              f"{traffic['received'] / runs:>10.0f}{traffic['sent'] / runs:>10.0f}"
+              f"{mean:>10.1f}{p95:>10.1f}{runs / elapsed:>10.1f}")
+
+    print("requests, sent and received are per run, in bytes on the wire including headers and retries")
+    server.shutdown()
+
+
+def main():
+    """This function runs the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Measure the network cost of the app's flows against a local stand-in.")
+    parser.add_argument("--runs", type=int, default=40, help="times each flow is run")
+    parser.add_argument("--clients", type=int, default=4, help="clients running each flow at the same time")
+    parser.add_argument("--users", type=int, default=200, help="users to seed the stand-in with")
+    parser.add_argument("--latency", type=float, default=0, help="seconds to delay every request by")
+    parser.add_argument("--jitter", type=float, default=0, help="up to this many more seconds of delay, at random")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with 503")
+    parser.add_argument("--drop-rate", type=float, default=0, help="share of requests closed without an answer")
+    parser.add_argument("--single", action="store_true", help="send the individual requests instead of the composite ones")
+    arguments = parser.parse_args()
+
+    BackendHandler.latency = arguments.latency
+    BackendHandler.jitter = arguments.jitter
+    BackendHandler.error_rate = arguments.error_rate
+    BackendHandler.drop_rate = arguments.drop_rate
+    benchmark(arguments.runs, arguments.clients, not arguments.single, arguments.users)
+
+
+if __name__ == "__main__":
+    main()
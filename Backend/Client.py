@@ -0,0 +1,297 @@
+"""
+The one client every screen talks to the backend through.
+
+All requests share a single session, which keeps its connections to the backend open, so only
+the first request pays for the TLS handshake. Every request has a timeout, and the requests
+that can safely be repeated are retried when the backend cannot be reached or is briefly
+unavailable.
+
+Logging in and registering are each sent as a single composite request, which the backend
+answers with everything the account screen needs. A backend without the composite endpoints is
+sent the individual requests instead.
+
+The backend's address can be changed with the NO2_BACKEND_URL environment variable, for example
+to use the local stand-in in MockServer.py:
+
+    NO2_BACKEND_URL=http://127.0.0.1:8000/backend_api python main.py
+"""
+
+# IMPORTS
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class BackendClient:
+    """
+    This class sends the app's requests to the backend over a pool of kept-alive connections.
+
+    The endpoint functions return the backend's decoded JSON response, except where noted.
+
+    Attributes
+    ----------
+    base_url: String
+          The address of the backend's API, without a trailing slash.
+    session: Session
+          The session every request is sent through. It keeps up to POOL_SIZE connections open.
+    composites: Boolean
+          False once the backend has answered that it has no composite endpoints, so they are
+          not tried again.
+    requests_sent: Integer
+          The number of requests sent to the backend so far, to measure what each flow costs.
+          Requests sent at the same time share a round trip, so it can be more than the round
+          trips waited for.
+    lock: Lock
+          Guards requests_sent.
+    """
+    BASE_URL = "https://no2project.herokuapp.com/backend_api"
+
+    # (connect, read) timeouts in seconds, by kind of endpoint
+    TIMEOUT = (5, 10)
+    LIST_TIMEOUT = (5, 20)
+    HEALTH_TIMEOUT = 5
+    PAGE_TIMEOUT = (5, 15)
+
+    # Requests that can safely be repeated are retried this many times, waiting 0.5, 1 and 2
+    # seconds in between
+    RETRIES = 3
+    BACKOFF = 0.5
+    RETRY_STATUSES = (502, 503, 504)
+    RETRY_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+
+    POOL_SIZE = 10
+
+    # The statuses a backend without an endpoint answers with
+    MISSING_STATUSES = (404, 405)
+
+    def __init__(self, base_url=None):
+        self.base_url = (base_url or os.environ.get("NO2_BACKEND_URL") or BackendClient.BASE_URL).rstrip("/")
+
+        retry = Retry(total=BackendClient.RETRIES,
+                      backoff_factor=BackendClient.BACKOFF,
+                      status_forcelist=BackendClient.RETRY_STATUSES,
+                      allowed_methods=BackendClient.RETRY_METHODS,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_maxsize=BackendClient.POOL_SIZE, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.composites = True
+        self.requests_sent = 0
+        self.lock = threading.Lock()
+
+    def request(self, method, path, timeout=TIMEOUT, **kwargs):
+        """
+        This function sends a request to one of the backend's endpoints.
+
+        :param method: the HTTP method
+        :param path: the endpoint's path, after no2_backend/
+        :param timeout: the (connect, read) timeout in seconds
+        :param kwargs: passed on to Session.request, such as the form data
+
+        :return: the response
+        """
+        with self.lock:
+            self.requests_sent += 1
+        return self.session.request(method, f"{self.base_url}/no2_backend/{path}", timeout=timeout, **kwargs)
+
+    def health(self):
+        """
+        This function checks that the backend can be reached.
+
+        :raises ConnectionError, Timeout: if it cannot
+        """
+        self.session.get(f"{self.base_url}/", timeout=BackendClient.HEALTH_TIMEOUT)
+
+    def fetch(self, url):
+        """
+        This function downloads a page from outside the backend, such as a news article.
+
+        :param url: the page's address
+
+        :return: the response
+        """
+        return self.session.get(url, timeout=BackendClient.PAGE_TIMEOUT)
+
+    # USERS
+    def users(self):
+        """This function gets every user."""
+        return self.request("GET", "users", timeout=BackendClient.LIST_TIMEOUT).json()
+
+    def user(self, username):
+        """This function gets a user."""
+        return self.request("GET", f"{username}/user").json()
+
+    def create_user(self, user):
+        """This function creates a user. The response is returned as it is."""
+        return self.request("POST", "create/user", data=user)
+
+    def update_user(self, username, user):
+        """This function replaces a user's details."""
+        return self.request("PUT", f"{username}/update/user", data=user).json()
+
+    def auth(self, credentials):
+        """
+        This function checks a user's credentials.
+
+        :return: True for a user, "Admin" for an admin, a falsy value if there is no match
+        """
+        return self.request("POST", "auth/user", data=credentials).json()
+
+    # SCORES
+    def scores(self):
+        """This function gets every player's score record."""
+        return self.request("GET", "scores", timeout=BackendClient.LIST_TIMEOUT).json()
+
+    def score(self, username):
+        """This function gets a player's score record."""
+        return self.request("GET", f"{username}/score").json()
+
+    def create_score(self, score):
+        """This function creates a player's score record. The response is returned as it is."""
+        return self.request("POST", "create/score", data=score)
+
+    def update_score(self, username, score):
+        """
+        This function replaces a player's score record. The response is returned as it is.
+
+        :raises HTTPError: if the backend refuses it
+        """
+        response = self.request("PUT", f"{username}/update/score", data=score)
+        response.raise_for_status()
+        return response
+
+    # LOGS
+    def logs(self):
+        """This function gets every log entry."""
+        return self.request("GET", "logs", timeout=BackendClient.LIST_TIMEOUT).json()
+
+    def create_log(self, log):
+        """This function adds a log entry. The response is returned as it is."""
+        return self.request("POST", "create/log", data=log)
+
+    # COMPOSITES
+    def composite(self, path, data):
+        """
+        This function sends a composite request, if the backend has composite endpoints.
+
+        :param path: the endpoint's path
+        :param data: the form data
+
+        :return: the response, or None if the backend has no such endpoint
+        """
+        if not self.composites:
+            return None
+
+        response = self.request("POST", path, data=data)
+        if response.status_code in BackendClient.MISSING_STATUSES:
+            self.composites = False
+            return None
+        return response
+
+    def login(self, credentials, ip=None):
+        """
+        This function checks a user's credentials and, if they match, gets everything the account
+        screen needs and records the login, in a single request.
+
+        Without the composite endpoint, the credentials are checked first, then the user's
+        details and score record are requested at the same time, and the login is left for
+        the caller to record.
+
+        :param credentials: the username and password
+        :param ip: the device's address, for the login's log entry, by default device_ip()
+
+        :return: a dictionary of "auth", see auth(), with the "user" and their "score" record
+                 (None for an admin) if the credentials match, and "logged", which is False
+                 if the user's logged_in status and the log entry still have to be sent
+        """
+        if ip is None:
+            ip = device_ip()
+        response = self.composite("login", {**credentials, "ip": ip})
+        if response is not None:
+            response.raise_for_status()
+            return response.json()
+
+        auth = self.auth(credentials)
+        if auth != "Admin" and auth is not True:
+            return {"auth": auth, "logged": False}
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            user = pool.submit(self.user, credentials["username"])
+            score = pool.submit(self.score, credentials["username"]) if auth is True else None
+            return {"auth": auth, "user": user.result(), "score": score and score.result(), "logged": False}
+
+    def register(self, user, score, ip=None):
+        """
+        This function creates a user and their score record and records the registration, in a
+        single request.
+
+        Without the composite endpoint, every user is requested to check the email and username
+        are free, then the user and their score record are created, and the registration is
+        left for the caller to record.
+
+        :param user: the user's details
+        :param score: the user's score record
+        :param ip: the device's address, for the registration's log entry, by default
+                   device_ip()
+
+        :return: a dictionary of the "taken" fields, "email" and "username", if either is
+                 already registered, otherwise of the new "user" and their "score" record and
+                 "logged", as for login()
+        """
+        if ip is None:
+            ip = device_ip()
+        response = self.composite("register", {**user, **score, "ip": ip})
+        if response is not None:
+            if response.status_code != 409:
+                response.raise_for_status()
+            return response.json()
+
+        users = self.users()
+        taken = [field for field, value in (("email", user["email"]), ("username", user["username"]))
+                 if any(existing[field] == value for existing in users)]
+        if taken:
+            return {"taken": taken}
+
+        self.create_user(user)
+        self.create_score(score)
+        return {"user": user, "score": score, "logged": False}
+
+    # ARTICLES
+    def articles(self):
+        """This function gets every news article."""
+        return self.request("GET", "articles", timeout=BackendClient.LIST_TIMEOUT).json()
+
+    def create_article(self, article):
+        """This function adds a news article."""
+        return self.request("POST", "create/article", data=article).json()
+
+    def delete_article(self, article_id):
+        """This function removes a news article."""
+        return self.request("DELETE", f"{article_id}/delete/article").json()
+
+
+@functools.lru_cache(maxsize=None)
+def device_ip():
+    """
+    This function finds the device's address, sent with the log entries. Finding it can wait on
+    DNS, so it is first found on a worker thread when the app starts and when a user logs in or
+    registers, and remembered after that.
+
+    :return: the address, or 127.0.0.1 if the device's name cannot be resolved
+    """
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return "127.0.0.1"
+
+
+# The client shared by the whole app
+backend = BackendClient()
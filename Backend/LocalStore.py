@@ -0,0 +1,494 @@
+"""
+An offline-first copy of the backend's data on the device. Nothing in here depends on Kivy.
+
+The screens read the scores, news articles and logs from a local SQLite database, so they open
+instantly and still work without a connection. A worker thread keeps the database in step with
+the backend: it sends the changes made on the device, oldest first, then downloads again the
+collections the open screen shows. The backend's copy wins, so once a change has been sent,
+whatever the backend made of it replaces the local guess. A change the backend refuses, or
+keeps failing on, is moved aside into the failed table, so it neither blocks the changes behind
+it nor is lost.
+
+Users' details are never kept on the device, as they include their passwords. Changes to them
+are only queued.
+"""
+
+# IMPORTS
+import base64
+from datetime import datetime
+import json
+import sqlite3
+import threading
+import time
+import requests
+
+from Backend.Client import backend, device_ip
+
+
+class LocalStore:
+    """
+    This class keeps the backend's collections in a SQLite database and queues the changes made
+    to them on the device until they can be sent.
+
+    Every collection is stored as rows of JSON in the order the backend listed them, keyed by
+    the field named in COLLECTIONS, and read back in the same shape the backend sends.
+
+    Attributes
+    ----------
+    path: String
+          The database file.
+    client: BackendClient
+          The client the collections are downloaded and the changes sent through.
+    database: Connection
+          The SQLite connection, shared by the screens and the worker.
+    lock: Lock
+          Guards the database.
+    condition: Condition
+          Wakes the worker when a change is queued or a collection is wanted, and drain() when a
+          change is sent.
+    wanted: Set
+          The collections to download as soon as the queued changes are sent.
+    watched: Set
+          The collections shown on the open screen, downloaded again every SYNC_INTERVAL seconds.
+    listeners: Dictionary
+          The callbacks to run after each collection is downloaded, by collection. They are run
+          on the worker thread.
+    online: Boolean
+          False while the backend cannot be reached.
+    worker: Thread
+          Sends the queued changes and downloads the collections.
+    """
+    # The collections, each downloaded with the client function of the same name, and the field
+    # each is keyed by. Log entries have no key, so they are keyed by position
+    COLLECTIONS = {
+        "scores": "score_username",
+        "articles": "id",
+        "logs": None
+    }
+
+    # Seconds between two downloads of a collection while it is shown
+    SYNC_INTERVAL = 60
+
+    # Seconds to wait before retrying, doubled after every failure
+    FIRST_RETRY = 2
+    MAX_RETRY = 300
+
+    # Times a change is sent while the backend answers it with a server error, before it is moved
+    # aside. Together with the wait between tries, that is over 10 minutes
+    MAX_ATTEMPTS = 10
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS records (
+            collection TEXT NOT NULL,
+            key TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (collection, key)
+        );
+        CREATE INDEX IF NOT EXISTS records_order ON records (collection, position);
+        CREATE TABLE IF NOT EXISTS writes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            method TEXT NOT NULL,
+            path TEXT NOT NULL,
+            data TEXT NOT NULL,
+            collection TEXT,
+            key TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS failed (
+            id INTEGER PRIMARY KEY,
+            method TEXT NOT NULL,
+            path TEXT NOT NULL,
+            data TEXT NOT NULL,
+            collection TEXT,
+            key TEXT,
+            status INTEGER NOT NULL,
+            reason TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS synced (
+            collection TEXT PRIMARY KEY,
+            synced_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, client=backend):
+        self.path = path
+        self.client = client
+        self.database = sqlite3.connect(path, check_same_thread=False)
+        self.database.executescript(LocalStore.SCHEMA)
+        # Earlier versions kept the users' details too, and did not record which record a change is
+        # to or how many times it was sent
+        with self.database:
+            columns = [column for _, column, *_ in self.database.execute("PRAGMA table_info(writes)")]
+            if "key" not in columns:
+                self.database.execute("ALTER TABLE writes ADD COLUMN collection TEXT")
+                self.database.execute("ALTER TABLE writes ADD COLUMN key TEXT")
+            if "attempts" not in columns:
+                self.database.execute("ALTER TABLE writes ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            self.database.execute("DELETE FROM records WHERE collection = 'users'")
+            self.database.execute("DELETE FROM synced WHERE collection = 'users'")
+        self.lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.wanted = set()
+        self.watched = set()
+        self.listeners = {collection: [] for collection in LocalStore.COLLECTIONS}
+        self.online = True
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    # READING
+    def rows(self, collection):
+        """
+        This function reads a collection.
+
+        :param collection: "scores", "articles" or "logs"
+
+        :return: a list of the collection's records, in the order the backend listed them
+        """
+        with self.lock:
+            cursor = self.database.execute("SELECT data FROM records WHERE collection = ? ORDER BY position",
+                                           (collection,))
+            return [json.loads(data) for data, in cursor]
+
+    def row(self, collection, key):
+        """
+        This function reads a single record of a collection.
+
+        :param collection: "scores" or "articles"
+        :param key: the record's username or id
+
+        :return: the record, or None if it is not on the device
+        """
+        with self.lock:
+            found = self.database.execute("SELECT data FROM records WHERE collection = ? AND key = ?",
+                                          (collection, str(key))).fetchone()
+        return json.loads(found[0]) if found else None
+
+    def synced_at(self, collection):
+        """
+        This function finds when a collection was last downloaded.
+
+        :param collection: the collection
+
+        :return: the time it was downloaded at, or None if it never was
+        """
+        with self.lock:
+            found = self.database.execute("SELECT synced_at FROM synced WHERE collection = ?",
+                                          (collection,)).fetchone()
+        return found[0] if found else None
+
+    # WRITING
+    def put(self, collection, record, key=None):
+        """
+        This function stores a record on the device only, such as one just read from the backend.
+        A new record is added at the end of its collection.
+
+        :param collection: the collection
+        :param record: the record
+        :param key: the record's key, by default its field named in COLLECTIONS
+        """
+        if key is None:
+            key = record[LocalStore.COLLECTIONS[collection]]
+
+        with self.lock, self.database:
+            self.database.execute(
+                "INSERT INTO records (collection, key, position, data) VALUES "
+                "(?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM records WHERE collection = ?), ?) "
+                "ON CONFLICT (collection, key) DO UPDATE SET data = excluded.data",
+                (collection, str(key), collection, json.dumps(record, default=str)))
+
+    def remove(self, collection, key):
+        """
+        This function deletes a record on the device only.
+
+        :param collection: the collection
+        :param key: the record's key
+        """
+        with self.lock, self.database:
+            self.database.execute("DELETE FROM records WHERE collection = ? AND key = ?", (collection, str(key)))
+
+    def queue(self, method, path, data=None, collection=None, key=None):
+        """
+        This function queues a change to be sent to the backend. The queue is kept in the
+        database, so changes made offline are sent the next time the app is opened if need be.
+
+        :param method: the HTTP method
+        :param path: the endpoint's path, see BackendClient.request()
+        :param data: the form data
+        :param collection: the collection of the record the change is to, if it is kept on the
+                           device. Downloads keep the device's copy of the record until the
+                           change is sent.
+        :param key: the record's key
+        """
+        with self.lock, self.database:
+            self.database.execute("INSERT INTO writes (method, path, data, collection, key) VALUES (?, ?, ?, ?, ?)",
+                                  (method, path, json.dumps(data or {}, default=str), collection,
+                                   None if key is None else str(key)))
+        with self.condition:
+            self.condition.notify_all()
+
+    def forget(self, collection):
+        """
+        This function deletes a collection on the device only, such as the logs once the admin
+        signs out.
+
+        :param collection: the collection
+        """
+        with self.lock, self.database:
+            self.database.execute("DELETE FROM records WHERE collection = ?", (collection,))
+            self.database.execute("DELETE FROM synced WHERE collection = ?", (collection,))
+
+    def update_user(self, username, user):
+        """
+        This function queues a change to a user's details. They are not kept on the device.
+
+        :param username: the user's username
+        :param user: the user's new details
+        """
+        self.queue("PUT", f"{username}/update/user", user)
+
+    def update_score(self, username, score, replay, steps):
+        """
+        This function changes a player's score record on the device and queues the change, with
+        the replay of the game that produced it, so the backend can verify the score.
+
+        :param username: the player's username
+        :param score: the player's score record, merged on the device, see AccountScreen.record_game()
+        :param replay: the EventLog of the game, as encoded by EventLog.to_bytes()
+        :param steps: the step the game ended in
+        """
+        # Queued first, so a download in between keeps the device's record
+        self.queue("PUT", f"{username}/update/score",
+                   dict(score, replay=base64.b64encode(replay).decode(), steps=steps), "scores", username)
+        self.put("scores", score, username)
+
+    def create_log(self, log):
+        """
+        This function queues a log entry. The logs are only downloaded for the admin, see
+        watch().
+
+        :param log: the log entry
+        """
+        self.queue("POST", "create/log", log)
+
+    def delete_article(self, article_id):
+        """
+        This function deletes a news article on the device and queues the deletion.
+
+        :param article_id: the article's id
+        """
+        self.queue("DELETE", f"{article_id}/delete/article", None, "articles", article_id)
+        self.remove("articles", article_id)
+
+    # SYNCING
+    def subscribe(self, collection, callback):
+        """
+        This function registers a callback to run after a collection is downloaded.
+
+        :param collection: the collection
+        :param callback: called with the collection's name, on the worker thread
+        """
+        self.listeners[collection].append(callback)
+
+    def watch(self, collection):
+        """
+        This function downloads a collection now and every SYNC_INTERVAL seconds, while a screen
+        shows it.
+
+        :param collection: the collection
+        """
+        with self.condition:
+            self.watched.add(collection)
+        self.request_sync(collection)
+
+    def unwatch(self, collection):
+        """
+        This function stops downloading a collection once no screen shows it.
+
+        :param collection: the collection
+        """
+        with self.condition:
+            self.watched.discard(collection)
+
+    def request_sync(self, *collections):
+        """
+        This function asks the worker to download collections as soon as it can.
+
+        :param collections: the collections, all of them if none are given
+        """
+        with self.condition:
+            self.wanted.update(collections or LocalStore.COLLECTIONS)
+            self.condition.notify_all()
+
+    def pending(self):
+        """This function returns the number of changes waiting to be sent."""
+        with self.lock:
+            return self.database.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+
+    def failed(self):
+        """
+        This function reads the changes that were moved aside, see set_aside().
+
+        :return: a list of dictionaries of each change's method, path, data, collection, key,
+                 the status the backend last answered it with and why it was moved aside
+        """
+        with self.lock:
+            cursor = self.database.execute(
+                "SELECT method, path, data, collection, key, status, reason FROM failed ORDER BY id")
+            return [{"method": method, "path": path, "data": json.loads(data), "collection": collection,
+                     "key": key, "status": status, "reason": reason}
+                    for method, path, data, collection, key, status, reason in cursor]
+
+    def flush(self):
+        """
+        This function sends the queued changes, oldest first. A change the backend refuses would
+        be refused again, and a change it has answered with a server error MAX_ATTEMPTS times
+        would block the ones behind it, so either is moved aside.
+
+        :raises RequestException: if the backend cannot be reached or answers with a server
+                                  error, leaving the rest queued
+        """
+        while True:
+            with self.lock:
+                write = self.database.execute("SELECT id, method, path, data, collection, key, attempts FROM writes "
+                                              "ORDER BY id LIMIT 1").fetchone()
+            if write is None:
+                return
+
+            write_id, method, path, data, collection, key, attempts = write
+            response = self.client.request(method, path, data=json.loads(data))
+            if response.status_code >= 500 and attempts + 1 < LocalStore.MAX_ATTEMPTS:
+                with self.lock, self.database:
+                    self.database.execute("UPDATE writes SET attempts = attempts + 1 WHERE id = ?", (write_id,))
+                response.raise_for_status()
+
+            if response.status_code >= 400:
+                self.set_aside(write, response)
+            else:
+                with self.lock, self.database:
+                    self.database.execute("DELETE FROM writes WHERE id = ?", (write_id,))
+            with self.condition:
+                self.condition.notify_all()
+
+    def set_aside(self, write, response):
+        """
+        This function moves a change the backend did not accept out of the queue, into the
+        failed table. The device's copy of the record it changed is downloaded again, so it
+        matches the backend's. A score the backend rejected is also logged for the admin.
+
+        :param write: the queued change's row
+        :param response: the backend's answer to it
+        """
+        write_id, method, path, data, collection, key, _ = write
+        try:
+            reason = response.json()["error"]
+        except (ValueError, KeyError, TypeError):
+            reason = response.reason or f"status {response.status_code}"
+
+        with self.lock, self.database:
+            self.database.execute(
+                "INSERT INTO failed (id, method, path, data, collection, key, status, reason) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (write_id, method, path, data, collection, key, response.status_code, reason))
+            self.database.execute("DELETE FROM writes WHERE id = ?", (write_id,))
+
+        if collection == "scores" and 400 <= response.status_code < 500:
+            self.create_log({
+                "username": key,
+                "time_occurred": datetime.now(),
+                "warning_desc": f"score rejected: {reason.removeprefix('score rejected: ')}",
+                "ip": device_ip()
+            })
+        if collection is not None:
+            self.request_sync(collection)
+
+    def drain(self, timeout):
+        """
+        This function waits for the worker to send the queued changes, such as before the app
+        closes. The changes still queued after the timeout are sent the next time the app is
+        opened.
+
+        :param timeout: the most seconds to wait
+
+        :return: True if every change was sent
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.pending():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def download(self, collection):
+        """
+        This function replaces a collection with the backend's copy, except for the records with
+        changes still to be sent, which keep the device's copy.
+
+        :param collection: the collection
+        """
+        records = getattr(self.client, collection)()
+        key = LocalStore.COLLECTIONS[collection]
+
+        with self.lock, self.database:
+            changed = {changed_key for changed_key, in self.database.execute(
+                "SELECT key FROM writes WHERE collection = ?", (collection,))}
+            # A changed record missing here was deleted on the device
+            local = dict(self.database.execute(
+                "SELECT key, data FROM records WHERE collection = ? AND key IN "
+                "(SELECT key FROM writes WHERE collection = ?)", (collection, collection)).fetchall())
+
+            rows = []
+            for record in records:
+                record_key = str(record[key]) if key else str(len(rows))
+                if record_key not in changed:
+                    rows.append((collection, record_key, len(rows), json.dumps(record, default=str)))
+                elif record_key in local:
+                    rows.append((collection, record_key, len(rows), local.pop(record_key)))
+            # Records added on the device that the backend does not have yet
+            for record_key, data in local.items():
+                rows.append((collection, record_key, len(rows), data))
+
+            self.database.execute("DELETE FROM records WHERE collection = ?", (collection,))
+            self.database.executemany(
+                "INSERT OR REPLACE INTO records (collection, key, position, data) VALUES (?, ?, ?, ?)", rows)
+            self.database.execute("INSERT OR REPLACE INTO synced (collection, synced_at) VALUES (?, ?)",
+                                  (collection, time.time()))
+
+        for callback in self.listeners[collection]:
+            callback(collection)
+
+    def run(self):
+        """This function is the worker's loop, sending the queued changes then downloading the wanted collections."""
+        retry = LocalStore.FIRST_RETRY
+        next_sync = time.monotonic() + LocalStore.SYNC_INTERVAL
+
+        while True:
+            with self.condition:
+                while not self.wanted and not self.pending() and time.monotonic() < next_sync:
+                    self.condition.wait(next_sync - time.monotonic())
+                if time.monotonic() >= next_sync:
+                    self.wanted.update(self.watched)
+                    next_sync = time.monotonic() + LocalStore.SYNC_INTERVAL
+                wanted = self.wanted
+                self.wanted = set()
+
+            try:
+                # Send the changes first, so the collections downloaded include them
+                self.flush()
+                for collection in LocalStore.COLLECTIONS:
+                    if collection in wanted:
+                        self.download(collection)
+                        wanted.discard(collection)
+            except (requests.RequestException, ValueError, KeyError, TypeError):
+                # Keep what is on the device and try again later
+                self.online = False
+                with self.condition:
+                    self.wanted.update(wanted)
+                threading.Event().wait(retry)
+                retry = min(retry * 2, LocalStore.MAX_RETRY)
+                continue
+
+            self.online = True
+            retry = LocalStore.FIRST_RETRY
@@ -0,0 +1,556 @@
+"""
+A local stand-in for the backend, with the composite login and register endpoints.
+
+It answers every endpoint the client uses, for users, scores, news articles and logs, keeping
+everything in memory, and verifies finished games like ScoreVerifier.py does. Every request
+can be delayed and made to fail, to see how the app copes with a slow or unreliable network,
+and the bytes each request and response take are counted. The composite endpoints do in one
+request what the flows otherwise need several for:
+
+    POST /backend_api/no2_backend/login       checks the credentials, sets logged_in, logs the
+                                              login and answers with the user and their score
+    POST /backend_api/no2_backend/register    creates the user and their score record, logs the
+                                              registration and answers with both
+
+Run it from the root directory to serve it, or to count the round trips and requests each flow
+takes to reach the account screen with and without the composite endpoints. Benchmark.py measures
+every flow against it.
+
+    python -m Backend.MockServer --port 8000 --seed --latency 0.1 --error-rate 0.05
+    python -m Backend.MockServer --measure
+"""
+
+# IMPORTS
+import argparse
+from datetime import datetime
+from http.server import ThreadingHTTPServer
+import random
+import re
+import threading
+import time
+
+from Backend.Client import BackendClient
+from Backend.ScoreVerifier import ScoreVerifierHandler
+
+
+class Meter:
+    """
+    This class counts the bytes read from or written to one of the stand-in's connections.
+
+    Attributes
+    ----------
+    file: File
+          The connection's file.
+    direction: String
+          The key of traffic the bytes are added to.
+    """
+    def __init__(self, file, direction):
+        self.file = file
+        self.direction = direction
+
+    def count(self, data):
+        """
+        This function adds bytes to the traffic.
+
+        :param data: the bytes
+
+        :return: the bytes
+        """
+        with BackendHandler.lock:
+            BackendHandler.traffic[self.direction] += len(data)
+        return data
+
+    def read(self, *args):
+        return self.count(self.file.read(*args))
+
+    def readline(self, *args):
+        return self.count(self.file.readline(*args))
+
+    def write(self, data):
+        return self.file.write(self.count(data))
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+class BackendHandler(ScoreVerifierHandler):
+    """
+    This class answers the backend's requests from memory.
+
+    Attributes
+    ----------
+    users: Dictionary
+          Every user's details, by username. Shared by all requests.
+    logs: List
+          Every log entry, oldest first. Shared by all requests.
+    articles: Dictionary
+          Every news article, by id. Shared by all requests.
+    latency: Float
+          Seconds to wait before answering each request, to stand in for the network.
+    jitter: Float
+          Up to this many more seconds are added to the latency at random.
+    error_rate: Float
+          The share of requests answered with 503 Service Unavailable.
+    drop_rate: Float
+          The share of requests whose connection is closed without an answer.
+    dice: Random
+          Decides the jitter and which requests fail, seeded so runs can be repeated.
+    traffic: Dictionary
+          The number of requests answered and the bytes received and sent since the last
+          reset(). Shared by all requests.
+    """
+    PREFIX = "/backend_api/no2_backend/"
+
+    # The endpoints, by method, and the function answering each
+    ROUTES = {
+        "GET": [
+            (re.compile(r"users"), "list_users"),
+            (re.compile(r"scores"), "list_scores"),
+            (re.compile(r"logs"), "list_logs"),
+            (re.compile(r"articles"), "list_articles"),
+            (re.compile(r"(?P<username>[^/]+)/user"), "get_user"),
+            (re.compile(r"(?P<username>[^/]+)/score"), "get_score")
+        ],
+        "POST": [
+            (re.compile(r"auth/user"), "auth_user"),
+            (re.compile(r"create/user"), "create_user"),
+            (re.compile(r"create/score"), "create_score"),
+            (re.compile(r"create/log"), "create_log"),
+            (re.compile(r"create/article"), "create_article"),
+            (re.compile(r"login"), "login"),
+            (re.compile(r"register"), "register")
+        ],
+        "PUT": [
+            (re.compile(r"(?P<username>[^/]+)/update/user"), "update_user"),
+            (re.compile(r"(?P<username>[^/]+)/update/score"), "update_score")
+        ],
+        "DELETE": [
+            (re.compile(r"(?P<article_id>[0-9]+)/delete/article"), "delete_article")
+        ]
+    }
+
+    USER_FIELDS = ("username", "role", "email", "password", "registered_on", "last_logged_in", "logged_in",
+                   "allow_emails")
+    SCORE_FIELDS = ("score_username", "high_score", "date_achieved", "previous_score", "most_days_lasted",
+                    "previous_days_lasted")
+    LOG_FIELDS = ("username", "time_occurred", "warning_desc", "ip")
+    ARTICLE_FIELDS = ("link", "title", "desc", "image")
+
+    # Form data arrives as text
+    BOOLEANS = ("logged_in", "allow_emails")
+    INTEGERS = ("high_score", "previous_score", "most_days_lasted", "previous_days_lasted")
+
+    users = {}
+    logs = []
+    articles = {}
+    latency = 0
+    jitter = 0
+    error_rate = 0
+    drop_rate = 0
+    dice = random.Random(0)
+    traffic = {"requests": 0, "received": 0, "sent": 0}
+
+    def setup(self):
+        ScoreVerifierHandler.setup(self)
+        self.rfile = Meter(self.rfile, "received")
+        self.wfile = Meter(self.wfile, "sent")
+
+    @staticmethod
+    def reset():
+        """
+        This function resets the traffic counters.
+
+        :return: the traffic counted since the last reset
+        """
+        with BackendHandler.lock:
+            traffic = dict(BackendHandler.traffic)
+            BackendHandler.traffic = dict.fromkeys(traffic, 0)
+        return traffic
+
+    def dispatch(self, method):
+        """
+        This function answers a request with the function of the endpoint it is for, after the
+        injected latency, unless the request is chosen to fail.
+
+        :param method: the request's HTTP method
+        """
+        form = self.read_form()
+        with BackendHandler.lock:
+            BackendHandler.traffic["requests"] += 1
+            delay = BackendHandler.latency + BackendHandler.jitter * BackendHandler.dice.random()
+            roll = BackendHandler.dice.random()
+        time.sleep(delay)
+
+        if roll < BackendHandler.drop_rate:
+            self.close_connection = True
+            return
+        if roll < BackendHandler.drop_rate + BackendHandler.error_rate:
+            self.send_json(503, {"error": "service unavailable"})
+            return
+
+        path = self.path.split("?")[0]
+        if path.rstrip("/") == "/backend_api":
+            self.send_json(200, {})
+            return
+
+        if path.startswith(BackendHandler.PREFIX):
+            endpoint = path[len(BackendHandler.PREFIX):].rstrip("/")
+            for pattern, name in BackendHandler.ROUTES.get(method, []):
+                match = pattern.fullmatch(endpoint)
+                if match:
+                    getattr(self, name)(form=form, **match.groupdict())
+                    return
+
+        self.send_json(404, {"error": "not found"})
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    @staticmethod
+    def record(form, fields):
+        """
+        This function builds a record from form data.
+
+        :param form: the form data
+        :param fields: the record's fields
+
+        :return: the record, with its booleans and numbers converted from text
+        """
+        record = {}
+        for field in fields:
+            value = form.get(field, "")
+            if field in BackendHandler.BOOLEANS:
+                value = value == "True"
+            elif field in BackendHandler.INTEGERS:
+                value = int(value or 0)
+            record[field] = value
+        return record
+
+    def add_log(self, username, description, ip):
+        """
+        This function adds a log entry.
+
+        :param username: the user the entry is about
+        :param description: what happened
+        :param ip: the address of the user's device
+        """
+        BackendHandler.logs.append({
+            "username": username,
+            "time_occurred": str(datetime.now()),
+            "warning_desc": description,
+            "ip": ip
+        })
+
+    def check(self, form):
+        """
+        This function checks a user's credentials.
+
+        :param form: the username and password
+
+        :return: True for a user, "Admin" for an admin, False if there is no match
+        """
+        user = BackendHandler.users.get(form.get("username"))
+        if user is None or user["password"] != form.get("password"):
+            return False
+        return "Admin" if user["role"] == "admin" else True
+
+    # SINGLE ENDPOINTS
+    def list_users(self, form):
+        with BackendHandler.lock:
+            users = list(BackendHandler.users.values())
+        self.send_json(200, users)
+
+    def list_scores(self, form):
+        with BackendHandler.lock:
+            scores = list(BackendHandler.scores.values())
+        self.send_json(200, scores)
+
+    def list_logs(self, form):
+        with BackendHandler.lock:
+            logs = list(BackendHandler.logs)
+        self.send_json(200, logs)
+
+    def list_articles(self, form):
+        with BackendHandler.lock:
+            articles = list(BackendHandler.articles.values())
+        self.send_json(200, articles)
+
+    def get_user(self, form, username):
+        with BackendHandler.lock:
+            user = BackendHandler.users.get(username)
+        if user is None:
+            self.send_json(404, {"error": "no such user"})
+        else:
+            self.send_json(200, user)
+
+    def get_score(self, form, username):
+        with BackendHandler.lock:
+            score = BackendHandler.scores.get(username)
+        if score is None:
+            self.send_json(404, {"error": "no such user"})
+        else:
+            self.send_json(200, score)
+
+    def auth_user(self, form):
+        with BackendHandler.lock:
+            auth = self.check(form)
+        self.send_json(200, auth)
+
+    def create_user(self, form):
+        user = self.record(form, BackendHandler.USER_FIELDS)
+        with BackendHandler.lock:
+            BackendHandler.users[user["username"]] = user
+        self.send_json(201, user)
+
+    def create_score(self, form):
+        score = self.record(form, BackendHandler.SCORE_FIELDS)
+        with BackendHandler.lock:
+            BackendHandler.scores[score["score_username"]] = score
+        self.send_json(201, score)
+
+    def create_log(self, form):
+        log = self.record(form, BackendHandler.LOG_FIELDS)
+        with BackendHandler.lock:
+            BackendHandler.logs.append(log)
+        self.send_json(201, log)
+
+    def create_article(self, form):
+        article = self.record(form, BackendHandler.ARTICLE_FIELDS)
+        with BackendHandler.lock:
+            article["id"] = max(BackendHandler.articles, default=0) + 1
+            BackendHandler.articles[article["id"]] = article
+        self.send_json(201, article)
+
+    def delete_article(self, form, article_id):
+        with BackendHandler.lock:
+            article = BackendHandler.articles.pop(int(article_id), None)
+        if article is None:
+            self.send_json(404, {"error": "no such article"})
+        else:
+            self.send_json(200, article)
+
+    def update_user(self, form, username):
+        user = self.record(form, BackendHandler.USER_FIELDS)
+        with BackendHandler.lock:
+            found = username in BackendHandler.users
+            if found:
+                BackendHandler.users[username] = user
+        if found:
+            self.send_json(200, user)
+        else:
+            self.send_json(404, {"error": "no such user"})
+
+    # COMPOSITE ENDPOINTS
+    def login(self, form):
+        with BackendHandler.lock:
+            auth = self.check(form)
+            if auth:
+                username = form["username"]
+                user = BackendHandler.users[username]
+                user["logged_in"] = True
+                score = BackendHandler.scores.get(username) if auth is True else None
+                self.add_log(username, "user login" if auth is True else "admin login", form.get("ip", ""))
+
+        if not auth:
+            self.send_json(200, {"auth": auth})
+        else:
+            self.send_json(200, {"auth": auth, "user": dict(user), "score": score, "logged": True})
+
+    def register(self, form):
+        user = self.record(form, BackendHandler.USER_FIELDS)
+        score = self.record(form, BackendHandler.SCORE_FIELDS)
+
+        with BackendHandler.lock:
+            taken = [field for field in ("email", "username")
+                     if any(existing[field] == user[field] for existing in BackendHandler.users.values())]
+            if not taken:
+                BackendHandler.users[user["username"]] = user
+                BackendHandler.scores[score["score_username"]] = score
+                self.add_log(user["username"], "user registration and login", form.get("ip", ""))
+
+        if taken:
+            self.send_json(409, {"taken": taken})
+        else:
+            self.send_json(200, {"user": user, "score": score, "logged": True})
+
+
+def seed(users, articles, logs):
+    """
+    This function fills the stand-in with made up users, each with a score record, news
+    articles and log entries. User n is called player<n>, with the password password!<n>.
+
+    :param users: the number of users
+    :param articles: the number of news articles
+    :param logs: the number of log entries
+    """
+    dice = random.Random(1)
+    with BackendHandler.lock:
+        for n in range(users):
+            username = f"player{n}"
+            BackendHandler.users[username] = {
+                "username": username,
+                "role": "user",
+                "email": f"{username}@example.com",
+                "password": f"password!{n}",
+                "registered_on": "2021-01-01 12:00:00",
+                "last_logged_in": "2021-01-01 12:00:00",
+                "logged_in": False,
+                "allow_emails": True
+            }
+            high_score = dice.randrange(5000)
+            BackendHandler.scores[username] = {
+                "score_username": username,
+                "high_score": high_score,
+                "date_achieved": "2021-01-01 12:00:00",
+                "previous_score": dice.randrange(high_score + 1),
+                "most_days_lasted": high_score // 50,
+                "previous_days_lasted": 0
+            }
+
+        for n in range(1, articles + 1):
+            BackendHandler.articles[n] = {
+                "id": n,
+                "link": f"https://tinyurl.com/article{n}",
+                "title": f"Article {n} about the climate " + "and the oceans " * 5,
+                "desc": "A description of the article. " * 8,
+                "image": f"https://tinyurl.com/image{n}"
+            }
+
+        for n in range(logs):
+            BackendHandler.logs.append({
+                "username": f"player{n % max(users, 1)}",
+                "time_occurred": "2021-01-01 12:00:00",
+                "warning_desc": dice.choice(("user login", "user sign out", "unsuccessful login attempt")),
+                "ip": f"10.0.{n // 256 % 256}.{n % 256}"
+            })
+
+
+def start(port):
+    """
+    This function serves the stand-in from a background thread.
+
+    :param port: the port to listen on, 0 for any free port
+
+    :return: the server
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), BackendHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve(port):
+    """
+    This function serves the stand-in until it is interrupted.
+
+    :param port: the port to listen on
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), BackendHandler)
+    print(f"Serving the backend on http://127.0.0.1:{port}/backend_api/no2_backend/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+def measure(latency=0.05):
+    """
+    This function registers a user then logs them in, as the register and login screens do,
+    with and without the composite endpoints. Every request is delayed by the same latency, so
+    the wait until the account screen can be shown, divided by it, is the number of round trips
+    the user waits for. Requests sent at the same time share a round trip, so a flow can send
+    more requests than it waits round trips for. The requests the screens then queue in the
+    local store are counted separately, as the user does not wait for them.
+
+    :param latency: seconds each request is delayed by
+    """
+    server = start(0)
+    BackendHandler.latency = latency
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/backend_api"
+
+    for composites in (True, False):
+        client = BackendClient(base_url)
+        client.health()
+        client.composites = composites
+        username = "composite" if composites else "single"
+
+        user = {
+            "username": username,
+            "role": "user",
+            "email": f"{username}@example.com",
+            "password": "password!",
+            "registered_on": datetime.now(),
+            "last_logged_in": datetime.now(),
+            "logged_in": True,
+            "allow_emails": True
+        }
+        score = {
+            "score_username": username,
+            "high_score": 0,
+            "date_achieved": datetime(2000, 1, 1),
+            "previous_score": 0,
+            "most_days_lasted": 0,
+            "previous_days_lasted": 0
+        }
+        log = {"username": username, "time_occurred": datetime.now(), "ip": "127.0.0.1"}
+
+        print("Composite endpoints:" if composites else "Single endpoints:")
+        for flow in ("register", "login"):
+            sent = client.requests_sent
+            start_time = time.perf_counter()
+            if flow == "register":
+                result = client.register(user, score, "127.0.0.1")
+            else:
+                result = client.login({"username": username, "password": user["password"]}, "127.0.0.1")
+            waited = time.perf_counter() - start_time
+            waited_requests = client.requests_sent - sent
+
+            # What the screens then send in the background, through the local store
+            if not result["logged"]:
+                if flow == "login":
+                    client.update_user(username, {**result["user"], "logged_in": True})
+                client.create_log({**log, "warning_desc": flow})
+            queued = client.requests_sent - sent - waited_requests
+
+            print(f"  {flow}: waited {waited / latency:.0f} round trip(s) for {waited_requests} request(s) before "
+                  f"the account screen, then {queued} more request(s) were sent in the background")
+
+    server.shutdown()
+
+
+def main():
+    """This function runs the stand-in from the command line."""
+    parser = argparse.ArgumentParser(description="A local stand-in for the backend.")
+    parser.add_argument("--port", type=int, default=8000, help="port to serve on")
+    parser.add_argument("--seed", action="store_true", help="start with 200 users, 30 articles and 1000 log entries")
+    parser.add_argument("--latency", type=float, default=0, help="seconds to delay every request by")
+    parser.add_argument("--jitter", type=float, default=0, help="up to this many more seconds of delay, at random")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests answered with 503")
+    parser.add_argument("--drop-rate", type=float, default=0, help="share of requests closed without an answer")
+    parser.add_argument("--measure", action="store_true",
+                        help="count the round trips and requests to the account screen with and without the composite endpoints")
+    arguments = parser.parse_args()
+
+    if arguments.measure:
+        measure()
+        return
+
+    if arguments.seed:
+        seed(200, 30, 1000)
+    BackendHandler.latency = arguments.latency
+    BackendHandler.jitter = arguments.jitter
+    BackendHandler.error_rate = arguments.error_rate
+    BackendHandler.drop_rate = arguments.drop_rate
+    serve(arguments.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Runs the screens' backend requests on a pool of worker threads, so the app never freezes while
+it waits on the network.
+
+A request is submitted with the functions to call once it is answered. They are called on the
+main thread, on the next frame, so they can update the screens:
+
+    background.submit(backend.auth, credentials, on_success=self.authenticated,
+                      on_error=self.request_failed)
+
+Requests that do not depend on each other can be sent at the same time with gather(), which
+answers once all of them are.
+"""
+
+# IMPORTS
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from kivy.clock import Clock
+
+
+class RequestPool:
+    """
+    This class sends requests from worker threads and hands their results back to the main
+    thread.
+
+    Attributes
+    ----------
+    executor: ThreadPoolExecutor
+          The worker threads. The session in BackendClient keeps a connection open for each.
+    """
+    # Matches BackendClient.POOL_SIZE, so no worker waits for a connection
+    WORKERS = 10
+
+    def __init__(self, workers=WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backend")
+
+    def submit(self, function, *args, on_success=None, on_error=None):
+        """
+        This function calls a function on a worker thread.
+
+        :param function: the function, usually one of BackendClient's
+        :param args: passed on to the function
+        :param on_success: called on the main thread with what the function returned
+        :param on_error: called on the main thread with the exception the function raised. If it
+                         is not given, the exception is raised on the main thread.
+
+        :return: the Future of the call
+        """
+        future = self.executor.submit(function, *args)
+        future.add_done_callback(lambda done: self.answer(done.result, on_success, on_error))
+        return future
+
+    def gather(self, calls, on_success=None, on_error=None):
+        """
+        This function calls several functions at the same time, each on its own worker thread.
+
+        :param calls: a list of (function, args...) tuples
+        :param on_success: called on the main thread with the list of what the functions
+                           returned, in the order they were given, once all of them have
+        :param on_error: called on the main thread with the first exception raised, once all
+                         of the functions have returned
+        """
+        if not calls:
+            self.answer(list, on_success, on_error)
+            return
+
+        futures = []
+        lock = threading.Lock()
+        remaining = [len(calls)]
+
+        def collect():
+            return [future.result() for future in futures]
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self.answer(collect, on_success, on_error)
+
+        for function, *args in calls:
+            futures.append(self.executor.submit(function, *args))
+        # Counted once every call is sent, so the list is complete when the last one is read
+        for future in futures:
+            future.add_done_callback(done)
+
+    @staticmethod
+    def answer(result, on_success, on_error):
+        """
+        This function hands the outcome of a request back to the main thread.
+
+        :param result: returns the request's result, or raises its exception
+        :param on_success: called with the result
+        :param on_error: called with the exception
+        """
+        try:
+            value = result()
+        except Exception as error:
+            if on_error is None:
+                def callback(_, error=error):
+                    raise error
+            else:
+                def callback(_, error=error):
+                    on_error(error)
+        else:
+            def callback(_):
+                if on_success is not None:
+                    on_success(value)
+
+        Clock.schedule_once(callback)
+
+
+# The pool shared by the whole app
+background = RequestPool()
@@ -0,0 +1,238 @@
+"""
+A local stand-in for the backend's score endpoints that only accepts scores it can reproduce.
+
+A finished game's score is sent together with its replay: the game's seed and inputs, see
+EventLog, and the step the game was lost in. The verifier plays the game again on the engine,
+far faster than real time, and accepts the score and days lasted only if the replay ends
+with exactly those. The high score and most days lasted are then worked out from the
+verified games alone, whatever the client claims.
+
+Run it from the root directory to serve it, or to measure how fast it verifies games:
+
+    python -m Backend.ScoreVerifier --port 8000
+    python -m Backend.ScoreVerifier --benchmark 50
+"""
+
+# IMPORTS
+import argparse
+import base64
+import binascii
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qs
+
+from Game.Balance import script_game
+from Game.Engine import Engine
+from Game.EventLog import EventLog
+
+
+# The longest game verified, in steps (a day of play)
+MAX_STEPS = 3500000
+
+
+def verify(replay, steps, score, days):
+    """
+    This function plays a game again from its replay and checks its claimed result.
+
+    :param replay: the game's EventLog, as encoded by EventLog.to_bytes()
+    :param steps: the step the game was lost in
+    :param score: the claimed score
+    :param days: the claimed number of days lasted
+
+    :return: None if the game is verified, otherwise the reason it is not
+    """
+    if not 0 < steps <= MAX_STEPS:
+        return "the game is too long to verify"
+
+    try:
+        events = EventLog.from_bytes(replay)
+    except IndexError:
+        return "the replay is truncated"
+
+    engine = Engine()
+    engine.replay(events, steps)
+
+    if not engine.lost or engine.scheduler.steps != steps:
+        return "the replay does not end in a lost game at the claimed step"
+    if engine.state.score != score or engine.state.days != days:
+        return f"the replay ends with a score of {engine.state.score} after {engine.state.days} days"
+    return None
+
+
+class ScoreVerifierHandler(BaseHTTPRequestHandler):
+    """
+    This class answers the backend's score requests:
+
+        GET /backend_api/no2_backend/<username>/score
+        PUT /backend_api/no2_backend/<username>/update/score
+
+    Attributes
+    ----------
+    scores: Dictionary
+          The verified score record of every player, by username. Shared by all requests.
+    lock: Lock
+          Guards scores.
+    """
+    PATH = re.compile(r"^/backend_api/no2_backend/(?P<username>[^/]+)/(?P<action>score|update/score)/?$")
+
+    # Every response has a Content-Length, so connections can be kept alive between requests
+    protocol_version = "HTTP/1.1"
+
+    # The body is written after the headers, so it must not wait for their acknowledgement
+    disable_nagle_algorithm = True
+
+    scores = {}
+    lock = threading.Lock()
+
+    def send_json(self, status, body):
+        """
+        This function sends a JSON response.
+
+        :param status: the HTTP status
+        :param body: the object to send
+        """
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_form(self):
+        """
+        This function reads the request's form data. The whole request is read, so the
+        connection is ready for the next one.
+
+        :return: a dictionary of the form's fields
+        """
+        length = int(self.headers.get("Content-Length", 0))
+        return {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+
+    def do_GET(self):
+        match = ScoreVerifierHandler.PATH.match(self.path)
+        if match is None or match["action"] != "score":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        with ScoreVerifierHandler.lock:
+            score = ScoreVerifierHandler.scores.get(match["username"])
+
+        if score is None:
+            self.send_json(404, {"error": "no such user"})
+        else:
+            self.send_json(200, score)
+
+    def do_PUT(self):
+        form = self.read_form()
+
+        match = ScoreVerifierHandler.PATH.match(self.path)
+        if match is None or match["action"] != "update/score":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        self.update_score(match["username"], form)
+
+    def update_score(self, username, form):
+        """
+        This function verifies a finished game and merges it into the player's score record.
+
+        :param username: the player's username
+        :param form: the score record, with the game's replay and the step it ended in
+        """
+        try:
+            replay = base64.b64decode(form["replay"], validate=True)
+            steps = int(form["steps"])
+            score = int(form["previous_score"])
+            days = int(form["previous_days_lasted"])
+        except (KeyError, ValueError, binascii.Error):
+            self.send_json(400, {"error": "a score needs its replay, steps, previous_score and previous_days_lasted"})
+            return
+
+        reason = verify(replay, steps, score, days)
+        if reason is not None:
+            self.send_json(422, {"error": f"score rejected: {reason}"})
+            return
+
+        with ScoreVerifierHandler.lock:
+            record = ScoreVerifierHandler.scores.get(username, {
+                "score_username": username,
+                "high_score": 0,
+                "date_achieved": form.get("date_achieved", ""),
+                "most_days_lasted": 0
+            })
+            if score >= record["high_score"]:
+                record["high_score"] = score
+                record["date_achieved"] = form.get("date_achieved", "")
+            record["previous_score"] = score
+            record["most_days_lasted"] = max(days, record["most_days_lasted"])
+            record["previous_days_lasted"] = days
+            ScoreVerifierHandler.scores[username] = record
+
+        self.send_json(200, record)
+
+    def log_message(self, format, *args):
+        # Keep the benchmark's output readable
+        pass
+
+
+def serve(port):
+    """
+    This function serves the verifier until it is interrupted.
+
+    :param port: the port to listen on
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), ScoreVerifierHandler)
+    print(f"Verifying scores on http://127.0.0.1:{port}/backend_api/no2_backend/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+def benchmark(games):
+    """
+    This function records games played by the balancing harness's scripted player, then times
+    their verification on a single core.
+
+    :param games: the number of games to verify
+    """
+    recorded = []
+    for seed in range(games):
+        engine = Engine(seed=seed)
+        script_game(engine, seed, 10000, 5)
+        recorded.append((engine.events.to_bytes(), engine.scheduler.steps, engine.state.score, engine.state.days))
+
+    start = time.perf_counter()
+    for replay, steps, score, days in recorded:
+        assert verify(replay, steps, score, days) is None
+    elapsed = time.perf_counter() - start
+
+    played = sum(steps for replay, steps, score, days in recorded) * Engine.TIMESTEP
+    size = sum(len(replay) for replay, steps, score, days in recorded) / games
+    print(f"{games} games verified in {elapsed:.2f} s: {games / elapsed:.1f} games per second per core")
+    print(f"{played / 3600:.1f} hours of play, {played / elapsed:.0f} times faster than real time")
+    print(f"{size:.0f} bytes of replay per game on average")
+
+    # A tampered score must be rejected
+    replay, steps, score, days = recorded[0]
+    assert verify(replay, steps, score + 1, days) is not None
+
+
+def main():
+    """This function runs the verifier from the command line."""
+    parser = argparse.ArgumentParser(description="A local score endpoint that verifies scores by replaying games.")
+    parser.add_argument("--port", type=int, default=8000, help="port to serve on")
+    parser.add_argument("--benchmark", type=int, metavar="GAMES", help="time the verification of GAMES games and exit")
+    arguments = parser.parse_args()
+
+    if arguments.benchmark:
+        benchmark(arguments.benchmark)
+    else:
+        serve(arguments.port)
+
+
+if __name__ == "__main__":
+    main()
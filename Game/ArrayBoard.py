@@ -0,0 +1,174 @@
+"""
+An array-backed tile board for large grids. Needs numpy, which is optional in requirements.txt
+as the app itself does not use it. An engine plays on it when it is given as the board type:
+
+    Engine(board_type=ArrayTileBoard, rows=64, cols=64)
+"""
+
+# IMPORTS
+import time
+
+from Game.Engine import COLS, ROWS, TileBoard, starting_tiles
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ArrayTileBoard:
+    """
+    This class stores the state of every tile on the grid in a numpy array and floods or reclaims
+    the whole grid at once. It can be used by the Engine in place of a TileBoard.
+
+    Each tile has the same chance of changing as on a TileBoard: every neighbour that could
+    change it rolls once with the given chance. The neighbours are counted with a 3x3 stencil
+    and all the rolls of a pass are replaced by one batched draw, with a single number for each
+    tile that has at least one such neighbour. Unlike a TileBoard, a pass only looks at the grid
+    as it was at its start, so a tile flooded or reclaimed during the pass does not spread
+    further until the next one.
+
+    Attributes
+    ----------
+    tiles: ndarray
+          A flat int8 array of the tile states, using the same states as TileBoard.
+    rows: Integer
+          Number of rows in the grid.
+    cols: Integer
+          Number of columns in the grid.
+    grid: ndarray
+          A (rows, columns) view of tiles.
+    rng: Generator
+          The random number generator used for the rolls, seeded with the given seed.
+    """
+    # Offsets of the eight neighbours of a tile
+    NEIGHBOURS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+    def __init__(self, tiles=None, rows=ROWS, cols=COLS, seed=None):
+        if numpy is None:
+            raise ImportError("ArrayTileBoard requires numpy")
+
+        self.rows = rows
+        self.cols = cols
+        self.tiles = numpy.array(starting_tiles(rows, cols) if tiles is None else tiles, dtype=numpy.int8)
+        self.grid = self.tiles.reshape(rows, cols)
+        self.rng = numpy.random.default_rng(seed)
+
+        # Buffers reused by every pass
+        self._padded = numpy.zeros((rows + 2, cols + 2), dtype=numpy.int8)
+        self._counts = numpy.zeros((rows, cols), dtype=numpy.int8)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __getitem__(self, i):
+        return self.tiles[i]
+
+    def __setitem__(self, i, state):
+        self.tiles[i] = state
+
+    def count_neighbours(self, mask):
+        """
+        This function counts, for every tile, how many of its neighbours are set in a mask.
+
+        :param mask: a boolean (rows, columns) array
+
+        :return counts: an int8 (rows, columns) array of neighbour counts
+        """
+        rows, cols = self.rows, self.cols
+        self._padded[1:-1, 1:-1] = mask
+        # The bottom-right tile never spreads, see adjacency()
+        self._padded[rows, cols] = 0
+        self._counts.fill(0)
+
+        for row, col in ArrayTileBoard.NEIGHBOURS:
+            self._counts += self._padded[1 + row:rows + 1 + row, 1 + col:cols + 1 + col]
+
+        return self._counts
+
+    @staticmethod
+    def chances(chance):
+        """
+        This function works out the chance of a tile changing for each number of neighbours.
+
+        :param chance: percentage chance of each roll, rolled as randrange(101) < chance
+
+        :return: an array where index k is the chance of a tile with k neighbours changing
+        """
+        return 1 - (1 - chance / 101) ** numpy.arange(len(ArrayTileBoard.NEIGHBOURS) + 1)
+
+    def change(self, sources, targets, chance, state):
+        """
+        This function changes target tiles next to source tiles into the given state.
+
+        :param sources: a boolean (rows, columns) array of the tiles that can spread
+        :param targets: a boolean (rows, columns) array of the tiles that can be changed
+        :param chance: percentage chance of each roll
+        :param state: the state changed tiles are set to
+
+        :return changed: the indexes of the tiles that were changed
+        """
+        counts = self.count_neighbours(sources).ravel()
+
+        # Only tiles with at least one neighbour can change, so only they are rolled for
+        candidates = numpy.flatnonzero(targets.ravel() & (counts > 0))
+        rolls = self.rng.random(len(candidates), dtype=numpy.float32)
+
+        changed = candidates[rolls < ArrayTileBoard.chances(chance)[counts[candidates]]]
+        self.tiles[changed] = state
+
+        return changed.tolist()
+
+    def flood(self, chance):
+        """
+        This function changes land tiles into water tiles.
+
+        Each tile adjacent to a water tile has the given chance to be flooded.
+
+        :param chance: percentage chance of each roll flooding its tile
+
+        :return flooded: the indexes of the tiles that were flooded
+        """
+        water = self.grid >= TileBoard.WATER
+        return self.change(water, ~water, chance, TileBoard.WATER)
+
+    def reclaim(self, chance):
+        """
+        This function changes water tiles back into grass tiles. Locked water is never reclaimed.
+
+        Each water tile adjacent to a land tile has the given chance to be reclaimed.
+
+        :param chance: percentage chance of each roll reclaiming its tile
+
+        :return reclaimed: the indexes of the tiles that were reclaimed
+        """
+        land = self.grid <= TileBoard.TREE
+        return self.change(land, self.grid == TileBoard.WATER, chance, TileBoard.GRASS)
+
+    def is_flooded(self):
+        """This function returns True if there is no land left on the grid."""
+        return not numpy.any(self.tiles <= TileBoard.TREE)
+
+
+def benchmark(rows=1000, cols=1000, passes=20):
+    """
+    This function times flood and reclaim passes on a large random grid.
+
+    :param rows: number of rows in the grid
+    :param cols: number of columns in the grid
+    :param passes: number of passes of each to time
+    """
+    rng = numpy.random.default_rng(0)
+    tiles = rng.choice([TileBoard.GRASS, TileBoard.WATER], size=rows * cols, p=[0.9, 0.1])
+    board = ArrayTileBoard(tiles, rows, cols, seed=1)
+
+    for name, update in (("flood", board.flood), ("reclaim", board.reclaim)):
+        start = time.perf_counter()
+        for _ in range(passes):
+            update(15)
+        elapsed = (time.perf_counter() - start) / passes
+        print(f"{name}: {elapsed * 1000:.2f} ms per pass on {rows * cols} tiles")
+
+
+if __name__ == "__main__":
+    benchmark()
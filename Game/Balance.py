@@ -0,0 +1,223 @@
+"""
+Plays many scripted games at full speed to measure how the game's constants affect it.
+
+Each configuration is a set of overrides of the Engine's or OakTree's constants. Every
+configuration plays the same seeds, so the only difference between them is the overrides.
+The games are spread over all cores. Run it from the root directory, for example:
+
+    python -m Game.Balance --games 200 --config CO2_RATE=0.035 --config TREE_PRICE=4,FLOOD_TEMPERATURE=55
+
+The baseline, with no overrides, is always played first.
+"""
+
+# IMPORTS
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor
+import random
+import time
+
+from Game.Engine import Engine, OakTree, TileBoard
+
+
+# The player spends its oxygen on reducing CO2 above this value, on trees below it
+CLICK_CO2 = 50
+
+
+def parse_config(text):
+    """
+    This function reads a configuration from the command line.
+
+    :param text: comma separated NAME=VALUE overrides, where NAME is an Engine or OakTree constant
+
+    :return overrides: a dictionary of the overrides
+    """
+    overrides = {}
+    for override in filter(None, text.split(",")):
+        name, _, value = override.partition("=")
+        name = name.strip()
+        if not name.isupper() or not (hasattr(Engine, name) or hasattr(OakTree, name)):
+            raise argparse.ArgumentTypeError(f"{name} is not a constant of Engine or OakTree")
+        try:
+            overrides[name] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            raise argparse.ArgumentTypeError(f"{value} is not a number")
+    return overrides
+
+
+def positive_int(text):
+    """
+    This function reads a count from the command line that must be at least 1.
+
+    :param text: the count
+
+    :return: the count, as an integer
+    """
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text} is not a whole number")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not at least 1")
+    return value
+
+
+def make_engine(overrides, seed):
+    """
+    This function creates an engine with a configuration's overrides applied to it alone.
+
+    :param overrides: a dictionary of Engine and OakTree constants
+    :param seed: the seed of the game
+
+    :return engine: the engine, reset to a new game
+    """
+    tree_overrides = {name: value for name, value in overrides.items() if hasattr(OakTree, name)}
+    tree_type = type("OakTree", (OakTree,), tree_overrides) if tree_overrides else OakTree
+
+    engine = Engine(seed=seed, tree_type=tree_type)
+    for name, value in overrides.items():
+        if name not in tree_overrides:
+            setattr(engine, name, value)
+
+    # The scheduler is built with the constants when the game is reset
+    engine.reset(seed)
+    return engine
+
+
+def script_game(engine, seed, max_days, interval):
+    """
+    This function plays a game with a scripted player until it is lost or reaches max_days.
+
+    Every so often, the player collects all the ready trees. It then spends its oxygen on
+    reducing CO2 if CO2 is above CLICK_CO2, or on trees planted on random grass tiles. The time
+    between two of its turns is random, between half and one and a half times the interval.
+
+    :param engine: the engine, reset to a new game
+    :param seed: the seed of the player
+    :param max_days: the day the game is stopped at if it is not lost before
+    :param interval: the average number of seconds between two of the player's turns
+
+    :return flooded: the number of tiles flooded during the game
+    """
+    player = random.Random(seed)
+    board = engine.board
+    state = engine.state
+
+    # Count the flooded tiles as the flood rule runs
+    flooded = []
+    flood = engine.scheduler.tasks["flood"]
+    flood_rule = flood.callback
+    flood.callback = lambda interval: flooded.extend(flood_rule(interval))
+
+    while not engine.lost and state.days < max_days:
+        engine.scheduler.run(max(round(player.uniform(0.5, 1.5) * interval / engine.TIMESTEP), 1))
+        if engine.lost:
+            break
+
+        for tree in list(engine.trees.values()):
+            if tree.is_ready:
+                engine.collect_oxygen(tree)
+
+        if state.co2_value > CLICK_CO2:
+            engine.oxygen_click()
+        elif state.oxygen_value >= engine.tree_price:
+            grass = [i for i in range(len(board)) if board[i] == TileBoard.GRASS]
+            while grass and state.oxygen_value >= engine.tree_price:
+                engine.purchase_tree(grass.pop(player.randrange(len(grass))))
+
+    return len(flooded)
+
+
+def play_game(overrides, seed, max_days, interval):
+    """
+    This function plays a game of a configuration with the scripted player, see script_game().
+
+    :param overrides: a dictionary of Engine and OakTree constants
+    :param seed: the seed of the game, also used by the player
+    :param max_days: the day the game is stopped at if it is not lost before
+    :param interval: the average number of seconds between two of the player's turns
+
+    :return: the days lasted, score and number of tiles flooded, and whether the game was lost
+    """
+    engine = make_engine(overrides, seed)
+    flooded = script_game(engine, seed, max_days, interval)
+    return engine.state.days, engine.state.score, flooded, engine.lost
+
+
+def play_games(task):
+    """
+    This function plays one batch of games in a worker process.
+
+    :param task: the configuration index, overrides, seeds, max_days and interval of the batch
+
+    :return: the configuration index and a list of the results of play_game()
+    """
+    index, overrides, seeds, max_days, interval = task
+    return index, [play_game(overrides, seed, max_days, interval) for seed in seeds]
+
+
+def percentile(values, fraction):
+    """
+    This function finds a percentile of sorted values, by the nearest rank.
+
+    :param values: the sorted values
+    :param fraction: the percentile, between 0 and 1
+    """
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def summarise(values):
+    """
+    This function describes the distribution of some values.
+
+    :param values: the values
+
+    :return: a line of the mean, percentiles and extremes of the values
+    """
+    values = sorted(values)
+    return (f"mean {sum(values) / len(values):9.1f}   min {values[0]:7}   p10 {percentile(values, 0.1):7}   "
+            f"p50 {percentile(values, 0.5):7}   p90 {percentile(values, 0.9):7}   max {values[-1]:7}")
+
+
+def main():
+    """This function runs the harness from the command line."""
+    parser = argparse.ArgumentParser(description="Plays scripted games to measure the effect of the game's constants.")
+    parser.add_argument("--config", action="append", type=parse_config, default=[],
+                        help="comma separated NAME=VALUE overrides of Engine or OakTree constants, can be repeated")
+    parser.add_argument("--games", type=positive_int, default=100, help="games played per configuration")
+    parser.add_argument("--max-days", type=int, default=500, help="day a game is stopped at if it is not lost")
+    parser.add_argument("--interval", type=float, default=5, help="average seconds between the player's turns")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, one per core by default")
+    parser.add_argument("--batch", type=positive_int, default=10, help="games sent to a worker at a time")
+    arguments = parser.parse_args()
+
+    configs = [{}] + arguments.config
+    seeds = list(range(arguments.seed, arguments.seed + arguments.games))
+    tasks = [(index, overrides, seeds[start:start + arguments.batch], arguments.max_days, arguments.interval)
+             for index, overrides in enumerate(configs)
+             for start in range(0, len(seeds), arguments.batch)]
+
+    results = [[] for _ in configs]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(arguments.workers) as executor:
+        for index, games in executor.map(play_games, tasks):
+            results[index].extend(games)
+    elapsed = time.perf_counter() - start
+
+    for overrides, games in zip(configs, results):
+        days, scores, flooded, lost = zip(*games)
+        name = ", ".join(f"{name}={value}" for name, value in overrides.items()) or "baseline"
+        # A game is stopped after the player's turn in which it reaches max_days, so it can last,
+        # or be lost, a few days past it
+        print(f"{name}: {len(games)} games, {sum(lost)} lost, {len(games) - sum(lost)} stopped "
+              f"once they reached day {arguments.max_days}")
+        print(f"  days lasted   {summarise(days)}")
+        print(f"  score         {summarise(scores)}")
+        print(f"  tiles flooded {summarise(flooded)}")
+
+    print(f"{len(configs) * len(seeds)} games in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,776 @@
+"""The game's rules. Nothing in here depends on Kivy, so a game can be simulated without a window."""
+
+# IMPORTS
+from functools import lru_cache
+import heapq
+import itertools
+import os
+import random
+
+from Game.EventLog import COLLECT, OXYGEN_CLICK, PURCHASE, EventLog
+from Game.Scheduler import Scheduler
+
+
+# STARTING BOARD
+ROWS = 4
+COLS = 14
+STARTING_TILES = [
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3, 3,
+    0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 3, 3, 3,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3, 3, 3, 3,
+    0, 0, 0, 0, 0, 0, 0, 0, 3, 3, 3, 3, 3, 3
+]
+STARTING_TREE = 19
+
+
+def starting_tree(rows=ROWS, cols=COLS):
+    """
+    This function finds where the starting tree is planted on a grid of the given size.
+
+    :param rows: number of rows in the grid
+    :param cols: number of columns in the grid
+
+    :return: the starting tree's tile index
+    """
+    row, col = divmod(STARTING_TREE, COLS)
+    return (row * rows // ROWS) * cols + col * cols // COLS
+
+
+def starting_tiles(rows=ROWS, cols=COLS):
+    """
+    This function builds the starting grid. Grids of other sizes than the original are the
+    original stretched to the given size, with the starting tree planted on a single tile.
+
+    :param rows: number of rows in the grid
+    :param cols: number of columns in the grid
+
+    :return tiles: a list of tile states
+    """
+    if (rows, cols) == (ROWS, COLS):
+        return list(STARTING_TILES)
+
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            state = STARTING_TILES[(row * ROWS // rows) * COLS + col * COLS // cols]
+            tiles.append(TileBoard.GRASS if state == TileBoard.TREE else state)
+    tiles[starting_tree(rows, cols)] = TileBoard.TREE
+
+    return tiles
+
+
+@lru_cache(maxsize=None)
+def adjacency(rows, cols):
+    """
+    This function builds the adjacent tile indexes of every tile on a grid of the given size. It
+    is only worked out once per size.
+
+    The table is flat: the tiles adjacent to tile i are indexes[offsets[i]:offsets[i + 1]].
+
+    As in the original game, the bottom-right tile has no entries of its own: it can be flooded
+    or reclaimed by its neighbours, but never floods or reclaims them.
+
+    :param rows: number of rows in the grid
+    :param cols: number of columns in the grid
+
+    :return offsets, indexes: the start of each tile's entries in indexes, and the adjacent
+                              tile indexes of every tile one after the other
+    """
+    offsets = [0]
+    indexes = []
+    last = rows * cols - 1
+    for row in range(rows):
+        for col in range(cols):
+            if row * cols + col == last:
+                offsets.append(len(indexes))
+                continue
+            for row_offset in (-1, 0, 1):
+                for col_offset in (-1, 0, 1):
+                    if (row_offset or col_offset) and 0 <= row + row_offset < rows and 0 <= col + col_offset < cols:
+                        indexes.append((row + row_offset) * cols + col + col_offset)
+            offsets.append(len(indexes))
+
+    return tuple(offsets), tuple(indexes)
+
+
+class GameState:
+    """
+    This class stores the resources of a single game. Every game has its own, so any number of
+    games can be played side by side.
+
+    Attributes
+    ----------
+    oxygen_value: Integer
+          The oxygen collected.
+    oxygen_cap: Integer
+          The most oxygen that can be held.
+    co2_value: Float
+          The CO2 level.
+    co2_cap: Integer
+          The highest the CO2 level can go.
+    temperature: Float
+          The temperature.
+    days: Integer
+          The day counter.
+    score: Integer
+          The player's score.
+    """
+    __slots__ = ("oxygen_value", "oxygen_cap", "co2_value", "co2_cap", "temperature", "days", "score")
+
+    def __init__(self, oxygen_value=0, oxygen_cap=100, co2_value=0, co2_cap=100, temperature=25.0, days=1, score=0):
+        self.oxygen_value = oxygen_value
+        self.oxygen_cap = oxygen_cap
+        self.co2_value = co2_value
+        self.co2_cap = co2_cap
+        self.temperature = temperature
+        self.days = days
+        self.score = score
+
+
+class OakTree:
+    """
+    This class represents an Oak tree.
+
+    Attributes
+    ----------
+    i: Integer
+       The tree's location on the grid.
+    production: Integer
+       The amount of oxygen the tree produces.
+    is_ready: Boolean
+       True if the tree is ready to give oxygen, False if not.
+    ready_at: Float
+       The game time the tree becomes ready at, or None once it has been flooded.
+    """
+    GROWTH_TIME = 5
+    START_PRODUCTION = 5
+    MAX_PRODUCTION = 10
+
+    def __init__(self, i):
+        self.i = i
+        self.production = self.START_PRODUCTION
+        self.is_ready = False
+        self.ready_at = None
+
+    def collect(self):
+        """
+        This function empties the tree. The engine then restarts its growth.
+
+        :return production: the amount of oxygen collected
+        """
+        production = self.production
+
+        # Increase tree production
+        if self.production < self.MAX_PRODUCTION:
+            self.production += 1
+
+        self.is_ready = False
+
+        return production
+
+
+class CountingRandom(random.Random):
+    """
+    This class is a Random that counts the 32-bit words it draws, so where it is in its sequence
+    can be saved as its seed and that count instead of its 2.5 KB internal state. It is brought
+    back there by seeding it again and skipping as many words, see skip().
+
+    Attributes
+    ----------
+    seed_value: Integer
+          The seed it was last seeded with, chosen at random if it was seeded with None.
+    words: Integer
+          The number of 32-bit words drawn since it was last seeded.
+    """
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = int.from_bytes(os.urandom(8), "little")
+        self.seed_value = a
+        self.words = 0
+        super().seed(a, version)
+
+    def random(self):
+        self.words += 2
+        return super().random()
+
+    def getrandbits(self, k):
+        self.words += (k + 31) // 32
+        return super().getrandbits(k)
+
+    def uncounted_getrandbits(self):
+        """
+        This function gives getrandbits() without the counting, for loops that draw many words
+        and add them to words themselves.
+
+        :return: the getrandbits function
+        """
+        return super().getrandbits
+
+    def skip(self, words):
+        """
+        This function draws words without using them.
+
+        :param words: the number of 32-bit words to draw
+        """
+        # A draw of k bits takes k / 32 words, so they are drawn many at a time
+        while words > 0:
+            chunk = min(words, 1 << 16)
+            self.getrandbits(32 * chunk)
+            words -= chunk
+
+
+class TileBoard:
+    """
+    This class stores the state of every tile on the grid.
+
+    Attributes
+    ----------
+    tiles: List
+          A list of integers. Its size is the grid's rows * columns. Each value in the list
+          represents a separate tile state. 0 for grass (empty land to plant trees in), 1 for
+          oak_tree (land with oak tree), 2 for water (unusable space) and 3 for locked water
+          (water level cannot go below what it is on the starting grid).
+    rows: Integer
+          Number of rows in the grid.
+    cols: Integer
+          Number of columns in the grid.
+    offsets, indexes: Tuple
+          The grid's adjacency table, see adjacency().
+    rng: CountingRandom
+          The random number generator used for the rolls, seeded with the given seed.
+    """
+    GRASS = 0
+    TREE = 1
+    WATER = 2
+    LOCKED_WATER = 3
+
+    def __init__(self, tiles=None, rows=ROWS, cols=COLS, seed=None):
+        self.tiles = list(starting_tiles(rows, cols) if tiles is None else tiles)
+        self.rows = rows
+        self.cols = cols
+        self.offsets, self.indexes = adjacency(rows, cols)
+        self.rng = CountingRandom(seed)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __getitem__(self, i):
+        return self.tiles[i]
+
+    def __setitem__(self, i, state):
+        self.tiles[i] = state
+
+    def flood(self, chance):
+        """
+        This function changes land tiles into water tiles.
+
+        Each tile adjacent to a water tile has the given chance to be flooded.
+
+        :param chance: percentage chance of each roll flooding its tile
+
+        :return flooded: the indexes of the tiles that were flooded, in the order they flooded
+        """
+        tiles = self.tiles
+        offsets = self.offsets
+        indexes = self.indexes
+        getrandbits = self.rng.uncounted_getrandbits()
+        drawn = 0
+
+        flooded = []
+        for i in range(len(tiles)):
+            if tiles[i] == TileBoard.WATER or tiles[i] == TileBoard.LOCKED_WATER:
+                # Iterate through all adjacent tiles
+                for j in range(offsets[i], offsets[i + 1]):
+                    # Rolls randrange(101) as Random does, drawing 7 bits at a time, a word each
+                    roll = getrandbits(7)
+                    drawn += 1
+                    while roll > 100:
+                        roll = getrandbits(7)
+                        drawn += 1
+                    if roll < chance:
+                        index = indexes[j]
+                        if tiles[index] != TileBoard.WATER and tiles[index] != TileBoard.LOCKED_WATER:
+                            tiles[index] = TileBoard.WATER
+                            flooded.append(index)
+        self.rng.words += drawn
+        return flooded
+
+    def reclaim(self, chance):
+        """
+        This function changes water tiles back into grass tiles. Locked water is never reclaimed.
+
+        Each water tile adjacent to a land tile has the given chance to be reclaimed.
+
+        :param chance: percentage chance of each roll reclaiming its tile
+
+        :return reclaimed: the indexes of the tiles that were reclaimed, in the order they were
+                           reclaimed
+        """
+        tiles = self.tiles
+        offsets = self.offsets
+        indexes = self.indexes
+        getrandbits = self.rng.uncounted_getrandbits()
+        drawn = 0
+
+        reclaimed = []
+        for i in range(len(tiles)):
+            if tiles[i] == TileBoard.GRASS or tiles[i] == TileBoard.TREE:
+                # Iterate through all adjacent tiles
+                for j in range(offsets[i], offsets[i + 1]):
+                    # Rolls randrange(101) as Random does, drawing 7 bits at a time, a word each
+                    roll = getrandbits(7)
+                    drawn += 1
+                    while roll > 100:
+                        roll = getrandbits(7)
+                        drawn += 1
+                    if roll < chance:
+                        index = indexes[j]
+                        if tiles[index] == TileBoard.WATER:
+                            tiles[index] = TileBoard.GRASS
+                            reclaimed.append(index)
+        self.rng.words += drawn
+        return reclaimed
+
+    def is_flooded(self):
+        """This function returns True if there is no land left on the grid."""
+        for state in self.tiles:
+            if state == TileBoard.GRASS or state == TileBoard.TREE:
+                return False
+        return True
+
+    def discover_adjacent_tiles(self, i):
+        """This function discovers the adjacent tile indexes of a given tile index."""
+        return self.indexes[self.offsets[i]:self.offsets[i + 1]]
+
+
+class Engine:
+    """
+    This class runs the game's rules. The widgets in MainGame.py call into it and display the
+    results, while headless code can drive it directly through step().
+
+    Attributes
+    ----------
+    board_type: Callable
+          Called with the starting tiles, rows, columns and a seed to create the board for every
+          new game. TileBoard by default, or an ArrayTileBoard from ArrayBoard.py for large grids.
+    tree_type: Class
+          The class of the trees planted, OakTree by default.
+    rows: Integer
+          Number of rows in the grid.
+    cols: Integer
+          Number of columns in the grid.
+    seed: Integer
+          The seed of the current game. Every random roll of the game follows from it, so the
+          seed and the events are enough to play the game again.
+    rng: CountingRandom
+          The random number generator of the current game. The board's seed is drawn from it.
+    events: EventLog
+          The player's inputs during the current game.
+    state: GameState
+          The resources of the current game.
+    co2_base: Float
+          The CO2 value when the CO2 rate, which depends on the days and the temperature, last
+          changed or CO2 was last spent.
+    co2_steps: Integer
+          Steps since then. The CO2 value is always worked out from these two, so it does not
+          depend on how often the game clock was moved in between.
+    board: TileBoard
+          The state of every tile on the grid.
+    trees: Dictionary
+          The OakTree objects of all the trees in the grid, by tile index.
+    tree_timers: List
+          A heap of (ready_at, order, tree) entries for the growing trees, soonest first. Entries
+          of trees that were collected from or flooded since are skipped when they come up.
+    tree_num: Integer
+          Number of trees in the grid.
+    tree_price: Integer
+          (Oxygen) Cost of purchasing a tree.
+    flood_used: Boolean
+          Switched to True when flood() floods at least one tile, which puts it on cooldown, and
+          back to False when it next runs.
+    reclaim_used: Boolean
+          Switched to True when reclaim() reclaims at least one tile, which puts it on cooldown,
+          and back to False when it next runs.
+    lost: Boolean
+          True once the whole grid is flooded.
+    dirty: Set
+          Indexes of the tiles whose state, tree or tree readiness changed. Whoever displays the
+          grid redraws these tiles and clears the set.
+    scheduler: Scheduler
+          Runs the periodic rules as the game is stepped.
+    """
+    # Length of a step of the game clock, in seconds. Inputs are recorded to the step
+    TIMESTEP = 0.02487
+
+    # How often each periodic rule runs, in seconds
+    TEMPERATURE_INTERVAL = 2
+    DAY_INTERVAL = 2
+    FLOOD_INTERVAL = 2
+    RECLAIM_INTERVAL = 2
+    COOLDOWN = 10
+
+    # Rule constants. CO2 rises continuously, by CO2_RATE per second for every day lasted and
+    # every degree
+    CO2_RATE = 0.04
+    TREE_PRICE = 3
+    OXYGEN_CAP_LIMIT = 200
+    FLOOD_TEMPERATURE = 50
+    RECLAIM_TEMPERATURE = 32.1
+    FLOOD_CHANCE = 15
+    RECLAIM_CHANCE = 20
+
+    def __init__(self, board_type=TileBoard, rows=ROWS, cols=COLS, seed=None, tree_type=OakTree):
+        self.board_type = board_type
+        self.tree_type = tree_type
+        self.rows = rows
+        self.cols = cols
+        self.seed = None
+        self.rng = None
+        self.events = None
+        self.state = None
+        self.co2_base = None
+        self.co2_steps = None
+        self.board = None
+        self.trees = None
+        self.tree_timers = None
+        self.tree_order = itertools.count()
+        self.tree_num = None
+        self.tree_price = None
+        self.flood_used = None
+        self.reclaim_used = None
+        self.lost = None
+        self.dirty = None
+        self.scheduler = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        This function resets the game to the starting board.
+
+        :param seed: the seed of the new game, a random one if not given
+        """
+        self.state = GameState()
+        self.co2_base = self.state.co2_value
+        self.co2_steps = 0
+
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = CountingRandom(self.seed)
+        self.events = EventLog(self.seed)
+
+        self.scheduler = Scheduler(self.TIMESTEP, self.integrate)
+        self.scheduler.add("temperature", self.TEMPERATURE_INTERVAL, self.add_temp)
+        self.scheduler.add("day", self.DAY_INTERVAL, self.increment_day)
+        self.scheduler.add("flood", self.FLOOD_INTERVAL, self.flood)
+        self.scheduler.add("reclaim", self.RECLAIM_INTERVAL, self.reclaim)
+
+        self.board = self.board_type(starting_tiles(self.rows, self.cols), self.rows, self.cols,
+                                     seed=self.rng.randrange(2 ** 32))
+        self.trees = {}
+        self.tree_timers = []
+        self.plant_tree(starting_tree(self.rows, self.cols))
+        self.tree_num = 1
+        self.calculate_tree_price()
+        self.flood_used = False
+        self.reclaim_used = False
+        self.lost = False
+        self.dirty = set(range(len(self.board)))
+
+    def step(self, dt):
+        """
+        This function advances the game by dt seconds, running every rule that falls due. The
+        game stops advancing once it is lost.
+
+        :param dt: seconds to advance the game by
+
+        :return: the number of steps the game clock moved forward by
+        """
+        return self.scheduler.advance(dt)
+
+    def integrate(self, steps):
+        """
+        This function brings what changes continuously up to date after the game clock moved.
+        The days and the temperature only change when a rule runs, so in between, CO2 rises at
+        a constant rate and is worked out in one go, however far the clock moved.
+
+        :param steps: the number of steps the clock moved forward by
+        """
+        self.co2_steps += steps
+        self.add_co2(self.co2_steps * self.TIMESTEP)
+        self.ripen_trees()
+
+    def settle_co2(self):
+        """This function restarts the CO2 rise from the current CO2 value, after it or its rate changed."""
+        self.co2_base = self.state.co2_value
+        self.co2_steps = 0
+
+    def replay(self, events, steps=None):
+        """
+        This function plays a recorded game again from its seed and inputs. As every roll follows
+        from the seed, the game ends up exactly as it was.
+
+        Inputs the game screen would not have allowed, like planting on water or collecting from
+        a tree that is not ready, are ignored, as are inputs made after the game was lost.
+
+        :param events: the EventLog of the game
+        :param steps: the number of steps to play up to, by default the step of the last input
+        """
+        self.reset(events.seed)
+        scheduler = self.scheduler
+
+        for step, kind, i in events:
+            if step > scheduler.steps:
+                scheduler.run(step - scheduler.steps)
+
+            if self.lost:
+                break
+
+            if kind == PURCHASE:
+                if i < len(self.board):
+                    self.purchase_tree(i)
+            elif kind == OXYGEN_CLICK:
+                self.oxygen_click()
+            elif kind == COLLECT:
+                tree = self.trees.get(i)
+                if tree is not None and tree.is_ready:
+                    self.collect_oxygen(tree)
+
+        if steps is not None and steps > scheduler.steps:
+            scheduler.run(steps - scheduler.steps)
+
+    def add_score(self, value):
+        """
+        This function adds or removes score.
+
+        :param value: value to change the score by
+        """
+        self.state.score += value
+
+    def add_oxygen(self, value):
+        """
+        This function changes the current oxygen value without going over the cap.
+
+        :param value: value to change the oxygen value by
+        """
+        state = self.state
+        if state.oxygen_value < state.oxygen_cap - value:
+            state.oxygen_value += value
+        else:
+            state.oxygen_value = state.oxygen_cap
+
+    def add_oxygen_cap(self, value):
+        """
+        This function changes the maximum oxygen value.
+
+        :param value: value to change the maximum oxygen value by
+        """
+        self.state.oxygen_cap += value
+
+    def oxygen_click(self):
+        """
+        This function spends all collected oxygen. The CO2 value is reduced by half of what was
+        spent and the same amount is added to the score.
+        """
+        self.events.append(self.scheduler.steps, OXYGEN_CLICK)
+
+        state = self.state
+        if state.co2_value - state.oxygen_value / 2 > 0:
+            state.co2_value = state.co2_value - state.oxygen_value / 2
+        else:
+            state.co2_value = 0
+        self.settle_co2()
+
+        self.add_score(round(state.oxygen_value / 2))
+        state.oxygen_value = 0
+
+    def add_co2(self, seconds):
+        """
+        This function sets the CO2 value to what it rose to from co2_base, based on the days
+        lasted and the temperature.
+
+        :param seconds: the game time the CO2 rose for since co2_base
+        """
+        state = self.state
+        increase = (state.days + state.temperature) * self.CO2_RATE * seconds
+
+        if self.co2_base + increase < 100:
+            state.co2_value = self.co2_base + increase
+        else:
+            state.co2_value = state.co2_cap
+
+    def add_co2_cap(self, value):
+        """
+        This function changes the maximum co2 value.
+
+        :param value: value to change the maximum co2 value by
+        """
+        self.state.co2_cap += value
+
+    def add_temp(self, *args):
+        """This function increases or decreases the temperature value based on the CO2 value."""
+        state = self.state
+        modifier = (state.co2_value - 50) / 100
+
+        if modifier > 0:
+            modifier *= 2
+
+        choices = [modifier, modifier - 0.1, modifier + 0.1]
+        change = self.rng.choices(choices, weights=(50, 25, 25), k=1)[0]
+
+        if 20 < state.temperature + change < 60:
+            state.temperature += change
+            self.settle_co2()
+
+    def increment_day(self, *args):
+        """This function increments the day counter and adds score."""
+        self.state.days += 1
+        self.settle_co2()
+        self.add_score(2)
+
+    def plant_tree(self, i):
+        """
+        This function plants a tree and starts its growth.
+
+        :param i: the tile index
+
+        :return tree: the new tree object
+        """
+        tree = self.tree_type(i)
+        self.trees[i] = tree
+        self.grow_tree(tree)
+        return tree
+
+    def grow_tree(self, tree):
+        """
+        This function starts a tree's growth, to be ready GROWTH_TIME seconds from now.
+
+        :param tree: the tree object
+        """
+        tree.ready_at = self.scheduler.time + tree.GROWTH_TIME
+        heapq.heappush(self.tree_timers, (tree.ready_at, next(self.tree_order), tree))
+
+    def ripen_trees(self):
+        """This function switches every tree whose growth has finished to ready."""
+        while self.tree_timers and self.tree_timers[0][0] <= self.scheduler.time:
+            ready_at, order, tree = heapq.heappop(self.tree_timers)
+
+            # Skip entries of trees collected from or flooded since
+            if tree.ready_at == ready_at and not tree.is_ready:
+                tree.is_ready = True
+                self.dirty.add(tree.i)
+
+    def collect_oxygen(self, tree):
+        """
+        This function collects oxygen from a tree into the oxygen bar and adds score.
+
+        :param tree: the tree object to collect from
+        """
+        self.events.append(self.scheduler.steps, COLLECT, tree.i)
+
+        self.add_oxygen(tree.collect())
+        self.add_score(1)
+        self.dirty.add(tree.i)
+
+        # Restart the collection process
+        self.grow_tree(tree)
+
+    def calculate_tree_price(self):
+        """This function calculates the price of purchasing a new tree."""
+        self.tree_price = self.tree_num * self.TREE_PRICE
+
+    def purchase_tree(self, i):
+        """
+        This function handles the transaction of purchasing a tree. Trees can only be planted on
+        grass, which the tile may no longer be by the time the purchase is confirmed.
+
+        :param i: the tile index
+
+        :return: True if the tree was planted, False if the tile is not grass or there was not
+                 enough oxygen
+        """
+        # Not recorded, as replay() skips it too
+        if self.board[i] != TileBoard.GRASS:
+            return False
+
+        self.events.append(self.scheduler.steps, PURCHASE, i)
+
+        if self.state.oxygen_value < self.tree_price:
+            return False
+
+        # Spend oxygen
+        self.state.oxygen_value -= self.tree_price
+
+        # Update tile state
+        self.board[i] = TileBoard.TREE
+        self.plant_tree(i)
+        self.dirty.add(i)
+
+        # Add oxygen cap
+        if self.state.oxygen_cap < self.OXYGEN_CAP_LIMIT:
+            self.add_oxygen_cap(5)
+
+        # Update number of trees and calculate new tree price
+        self.tree_num += 1
+        self.calculate_tree_price()
+
+        # Gain score
+        self.add_score(5)
+
+        return True
+
+    def flood(self, *args):
+        """
+        This function floods the grid when the temperature is above FLOOD_TEMPERATURE.
+
+        Trees on flooded tiles are lost and every flooded tile deducts 5 score.
+
+        :return flooded: the indexes of the tiles that were flooded
+        """
+        self.flood_used = False
+
+        if round(self.state.temperature, 1) <= self.FLOOD_TEMPERATURE:
+            return []
+
+        flooded = self.board.flood(self.FLOOD_CHANCE)
+        if flooded:
+            # Remove the trees on flooded tiles
+            for i in flooded:
+                tree = self.trees.pop(i, None)
+                if tree is not None:
+                    tree.ready_at = None
+
+            self.dirty.update(flooded)
+            self.add_score(-5 * len(flooded))
+
+            # Cooldown
+            self.flood_used = True
+            self.scheduler.tasks["flood"].delay(self.COOLDOWN)
+
+            if self.board.is_flooded():
+                self.lost = True
+                self.scheduler.pause()
+
+        return flooded
+
+    def reclaim(self, *args):
+        """
+        This function reclaims flooded land when the temperature is below RECLAIM_TEMPERATURE.
+
+        Every reclaimed tile adds 15 score.
+
+        :return reclaimed: the indexes of the tiles that were reclaimed
+        """
+        self.reclaim_used = False
+
+        if round(self.state.temperature, 1) >= self.RECLAIM_TEMPERATURE:
+            return []
+
+        reclaimed = self.board.reclaim(self.RECLAIM_CHANCE)
+        if reclaimed:
+            self.dirty.update(reclaimed)
+            self.add_score(15 * len(reclaimed))
+
+            # Cooldown
+            self.reclaim_used = True
+            self.scheduler.tasks["reclaim"].delay(self.COOLDOWN)
+
+        return reclaimed
@@ -0,0 +1,128 @@
+"""
+A compact, append-only record of the player's inputs during a game.
+
+Together with the game's seed, the inputs are all that is needed to play the exact same game
+again, see Engine.replay(). Each event is stored as three varints: the number of steps since the
+previous event, the kind of input and the tile it was made on, so most events take 3 bytes.
+"""
+
+
+# Kinds of input
+PURCHASE = 0
+OXYGEN_CLICK = 1
+COLLECT = 2
+
+
+def write_varint(buffer, value):
+    """
+    This function appends a non-negative integer to a buffer, 7 bits per byte.
+
+    :param buffer: the bytearray to append to
+    :param value: the integer
+    """
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, position):
+    """
+    This function reads an integer written by write_varint().
+
+    :param data: the bytes to read from
+    :param position: where the integer starts
+
+    :return value, position: the integer, and where the data after it starts
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class EventLog:
+    """
+    This class records the inputs made during a game.
+
+    Attributes
+    ----------
+    seed: Integer
+          The seed the game's random number generator was started with.
+    data: bytearray
+          The encoded events.
+    last_step: Integer
+          The step the last event was made in.
+    """
+    def __init__(self, seed, data=b""):
+        self.seed = seed
+        self.data = bytearray()
+        self.last_step = 0
+
+        # Re-append existing events so last_step is up to date
+        for step, kind, i in EventLog.decode(data):
+            self.append(step, kind, i)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        return EventLog.decode(self.data)
+
+    def append(self, step, kind, i=0):
+        """
+        This function records an input.
+
+        :param step: the scheduler step the input was made in
+        :param kind: PURCHASE, OXYGEN_CLICK or COLLECT
+        :param i: the tile index the input was made on, 0 if it was not made on a tile
+        """
+        write_varint(self.data, step - self.last_step)
+        write_varint(self.data, kind)
+        write_varint(self.data, i)
+        self.last_step = step
+
+    @staticmethod
+    def decode(data):
+        """
+        This function reads back encoded events.
+
+        :param data: the encoded events
+
+        :return: an iterator of (step, kind, i) tuples
+        """
+        position = 0
+        step = 0
+        while position < len(data):
+            delta, position = read_varint(data, position)
+            kind, position = read_varint(data, position)
+            i, position = read_varint(data, position)
+            step += delta
+            yield step, kind, i
+
+    def to_bytes(self):
+        """
+        This function encodes the log, seed included.
+
+        :return: the encoded log
+        """
+        buffer = bytearray()
+        write_varint(buffer, self.seed)
+        return bytes(buffer + self.data)
+
+    @staticmethod
+    def from_bytes(data):
+        """
+        This function decodes a log encoded by to_bytes().
+
+        :param data: the encoded log
+
+        :return: the EventLog
+        """
+        seed, position = read_varint(data, 0)
+        return EventLog(seed, data[position:])
@@ -1,58 +1,52 @@
 """The main game."""
 
 # IMPORTS
-import random
 from datetime import datetime
-from functools import partial
-import requests
+import os
+from urllib.parse import quote
 
+from kivy.app import App
 from kivy.clock import Clock
+from kivy.core.image import Image as CoreImage
+from kivy.graphics import Color, Rectangle
 from kivy.properties import ObjectProperty
-from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
-from kivy.uix.image import Image
-from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import Screen
 
+from Game import Snapshot
+from Game.Engine import Engine, TileBoard
+from Game.Profiler import Profiler
+from Game.Textures import image
 
-# LAYOUT CLASSES
-class Resources:
-    """This class stores information accessed by all the other resource classes."""
-    # Oxygen variables
-    oxygen_value = 0
-    oxygen_cap = 100
-
-    # CO2 variables
-    co2_value = 0
-    co2_cap = 100
 
-    # Label variables
-    temperature = 25.0
-    days = 1
-    score = 0
-
-    @staticmethod
-    def reset_resources():
-        Resources.oxygen_value = 0
-        Resources.oxygen_cap = 100
+def bar_fill(value, cap, width):
+    """
+    This function works out how much of a bar is filled up, rounded to whole pixels so that the
+    bar is only redrawn when it visibly changes.
 
-        Resources.co2_value = 0
-        Resources.co2_cap = 100
+    :param value: the value shown by the bar
+    :param cap: the value of a full bar
+    :param width: the bar's width, in pixels
 
-        Resources.temperature = 25.0
-        Resources.days = 1
-        Resources.score = 0
+    :return: the filled fraction of the bar
+    """
+    if width <= 0:
+        return value / cap
+    return round(value / cap * width) / width
 
 
+# LAYOUT CLASSES
 class Background(Screen):
-    """This class is used for the window's background."""
+    """
+    This class is used for the window's background. Its colour follows the CO2 bar, so it is
+    only redrawn when the bar is.
+    """
     def __init__(self, co2, **kwargs):
         Screen.__init__(self, **kwargs)
         self.co2 = co2
         self.colour_percentage = self.co2.co2_percentage
-
-        self.sky_change = Clock.schedule_interval(self.update_background,  0.03)
+        self.co2.bind(co2_percentage=self.update_background)
 
     def update_background(self, *args):
         """This function updates the background colour percentage."""
@@ -66,22 +60,29 @@ class Oxygen(Screen):
     Attributes
     ----------
     oxygen_percentage: Float
-                       How much of the bar is filled up (value/cap).
+                       How much of the bar is filled up (value/cap), to the pixel.
     oxygen_value: Integer
                        The current oxygen value.
     oxygen_cap: Integer
                        Maximum possible oxygen value.
+    engine: Engine
+                       The engine running the game's rules.
     co2: CO2
                        The instance of the CO2 class used when building the final layout.
-                       Needed to access and manipulate the current co2 value.
+                       Needed to update the co2 bar.
+    score: Score
+                       The instance of the Score class used when building the final layout.
+                       Needed to update the score display.
     """
-    def __init__(self, co2, score, **kwargs):
+    def __init__(self, engine, co2, score, **kwargs):
         Screen.__init__(self, **kwargs)
-        self.oxygen_value = Resources.oxygen_value
-        self.oxygen_cap = Resources.oxygen_cap
+        self.engine = engine
+        self.oxygen_value = self.engine.state.oxygen_value
+        self.oxygen_cap = self.engine.state.oxygen_cap
         self.oxygen_percentage = self.oxygen_value / self.oxygen_cap
         self.co2 = co2
         self.score = score
+        self.bind(width=self.update_oxygen)
 
         # For testing purposes
         # Clock.schedule_interval(self.add_oxygen, 3)
@@ -92,13 +93,10 @@ class Oxygen(Screen):
 
         :param value: value to change the oxygen value by
         """
-        if Resources.oxygen_value < Resources.oxygen_cap - value:
-            Resources.oxygen_value += value
-        else:
-            Resources.oxygen_value = Resources.oxygen_cap
+        self.engine.add_oxygen(value)
 
-        self.oxygen_value = round(Resources.oxygen_value)
-        self.oxygen_percentage = Resources.oxygen_value / Resources.oxygen_cap
+        self.oxygen_value = round(self.engine.state.oxygen_value)
+        self.oxygen_percentage = bar_fill(self.engine.state.oxygen_value, self.engine.state.oxygen_cap, self.width)
 
     def add_oxygen_cap(self, value):
         """
@@ -106,31 +104,30 @@ class Oxygen(Screen):
 
         :param value: value to change the maximum oxygen value by
         """
-        Resources.oxygen_cap += value
+        self.engine.add_oxygen_cap(value)
 
-        self.oxygen_cap = Resources.oxygen_cap
-        self.oxygen_percentage = Resources.oxygen_value / Resources.oxygen_cap
+        self.oxygen_cap = self.engine.state.oxygen_cap
+        self.oxygen_percentage = bar_fill(self.engine.state.oxygen_value, self.engine.state.oxygen_cap, self.width)
 
     def oxygen_click(self):
         """
         This function is called when the oxygen bar is clicked. The oxygen bar is reset to 0, the
         CO2 bar is reduced and both bars are then updated.
         """
-        if Resources.co2_value - Resources.oxygen_value / 2 > 0:
-            Resources.co2_value = Resources.co2_value - Resources.oxygen_value / 2
-        else:
-            Resources.co2_value = 0
+        self.engine.oxygen_click()
 
-        self.score.add_score(round(Resources.oxygen_value/2))
-        Resources.oxygen_value = 0
+        self.score.update_score()
         self.update_oxygen()
-        CO2.update_co2(self.co2)
+        self.co2.update_co2()
 
-    def update_oxygen(self):
-        """This function updates the oxygen bar."""
-        self.oxygen_value = Resources.oxygen_value
-        self.oxygen_cap = Resources.oxygen_cap
-        self.oxygen_percentage = self.oxygen_value / self.oxygen_cap
+    def update_oxygen(self, *args):
+        """
+        This function updates the oxygen bar. Kivy properties only dispatch when their value
+        changes, so the display is only redrawn when the value, the cap or the bar's pixels do.
+        """
+        self.oxygen_value = self.engine.state.oxygen_value
+        self.oxygen_cap = self.engine.state.oxygen_cap
+        self.oxygen_percentage = bar_fill(self.oxygen_value, self.oxygen_cap, self.width)
 
 
 class CO2(Screen):
@@ -140,29 +137,21 @@ class CO2(Screen):
     Attributes
     ----------
     co2_percentage: Float
-                    How much of the bar is filled up (value/cap).
+                    How much of the bar is filled up (value/cap), to the pixel.
     co2_value: Integer
                     The current co2 value.
     co2_cap: Integer
                     Maximum possible co2 value.
+    engine: Engine
+                    The engine running the game's rules.
     """
-    def __init__(self, **kwargs):
+    def __init__(self, engine, **kwargs):
         Screen.__init__(self, **kwargs)
-        self.co2_value = Resources.co2_value
-        self.co2_cap = Resources.co2_cap
+        self.engine = engine
+        self.co2_value = self.engine.state.co2_value
+        self.co2_cap = self.engine.state.co2_cap
         self.co2_percentage = self.co2_value / self.co2_cap
-
-        self.add_co2_event = Clock.schedule_interval(self.add_co2, 0.02487)
-
-    def add_co2(self, *args):
-        """This function increases the CO2 value and updates the percentage."""
-        if Resources.co2_value + (Resources.days + Resources.temperature) * 0.08 * 0.012435 < 100:
-            Resources.co2_value += (Resources.days + Resources.temperature) * 0.08 * 0.012435
-        else:
-            Resources.co2_value = Resources.co2_cap
-
-        self.co2_value = round(Resources.co2_value)
-        self.co2_percentage = Resources.co2_value / Resources.co2_cap
+        self.bind(width=self.update_co2)
 
     def add_co2_cap(self, value):
         """
@@ -170,16 +159,19 @@ class CO2(Screen):
 
         :param value: value to change the co2 value by
         """
-        Resources.co2_cap += value
+        self.engine.add_co2_cap(value)
 
-        self.co2_cap = Resources.co2_cap
-        self.co2_percentage = Resources.co2_value / Resources.co2_cap
+        self.co2_cap = self.engine.state.co2_cap
+        self.co2_percentage = bar_fill(self.engine.state.co2_value, self.engine.state.co2_cap, self.width)
 
-    def update_co2(self):
-        """This function updates the CO2 bar."""
-        self.co2_value = Resources.co2_value
-        self.co2_cap = Resources.co2_cap
-        self.co2_percentage = self.co2_value / self.co2_cap
+    def update_co2(self, *args):
+        """
+        This function updates the CO2 bar. The value shown is rounded and the bar is rounded to
+        the pixel, so the display is only redrawn when either visibly changes.
+        """
+        self.co2_value = round(self.engine.state.co2_value)
+        self.co2_cap = self.engine.state.co2_cap
+        self.co2_percentage = bar_fill(self.engine.state.co2_value, self.co2_cap, self.width)
 
 
 class Borders(Screen):
@@ -200,27 +192,17 @@ class Temperature(Screen):
     ----------
     temperature: Integer
                  The temperature value.
+    engine: Engine
+                 The engine running the game's rules.
     """
-    def __init__(self, **kwargs):
+    def __init__(self, engine, **kwargs):
         Screen.__init__(self, **kwargs)
-        self.temperature = Resources.temperature
-
-        self.add_temp_event = Clock.schedule_interval(self.add_temp, 2)
-
-    def add_temp(self, *args):
-        """This function increases or decreases the temperature value based on the CO2 value."""
-        modifier = (Resources.co2_value - 50) / 100
+        self.engine = engine
+        self.temperature = self.engine.state.temperature
 
-        if modifier > 0:
-            modifier *= 2
-
-        choices = [modifier, modifier - 0.1, modifier + 0.1]
-        change = random.choices(choices, weights=(50, 25, 25), k=1)[0]
-
-        if 20 < Resources.temperature + change < 60:
-            Resources.temperature += change
-
-        self.temperature = round(Resources.temperature, 1)
+    def update_temperature(self):
+        """This function updates the temperature display."""
+        self.temperature = round(self.engine.state.temperature, 1)
 
 
 class Day(Screen):
@@ -231,19 +213,18 @@ class Day(Screen):
     ----------
     days: Integer
           The day counter.
+    engine: Engine
+          The engine running the game's rules.
     """
-    def __init__(self, score, **kwargs):
+    def __init__(self, engine, score, **kwargs):
         Screen.__init__(self, **kwargs)
-        self.days = Resources.days
+        self.engine = engine
+        self.days = self.engine.state.days
         self.score = score
 
-        self.increment_day_event = Clock.schedule_interval(self.increment_day, 2)
-
-    def increment_day(self, *args):
-        """This function increments the day counter and adds score."""
-        Resources.days += 1
-        self.days = Resources.days
-        self.score.add_score(2)
+    def update_day(self):
+        """This function updates the day counter display."""
+        self.days = self.engine.state.days
 
 
 class Score(Screen):
@@ -254,88 +235,109 @@ class Score(Screen):
     ----------
     score: Integer
            The player's score.
+    engine: Engine
+           The engine running the game's rules.
     """
-    def __init__(self, **kwargs):
+    def __init__(self, engine, **kwargs):
         Screen.__init__(self, **kwargs)
-        self.score = Resources.score
+        self.engine = engine
+        self.score = self.engine.state.score
 
     def add_score(self, value):
         """This function adds or removes score."""
-        Resources.score += value
-        self.score = Resources.score
+        self.engine.add_score(value)
+        self.update_score()
+
+    def update_score(self):
+        """This function updates the score display."""
+        self.score = self.engine.state.score
 
 
-class OakTree:
+class GameOverPopup(Popup):
     """
-    This class represents an Oak tree.
+    This class builds the game over popup.
 
     Attributes
     ----------
-
-    i: Integer
-       The tree's location on the grid.
-    oxygen: Oxygen
-       The instance of the oxygen class used when building the final layout.
-       Needed to access and manipulate the current co2 value.
-    production: Integer
-       The amount of oxygen the tree produces.
-    is_ready: Boolean
-       True if the tree is ready to give oxygen, False if not.
-    collect: ClockEvent
-       Calls the ready() function at the specified time interval to switch is_ready to True.
+    game: Game
+          The instance of the game being played.
+          Needed to access the window manager to send the player back to the account page.
     """
-    def __init__(self, i, oxygen):
-        self.i = i
-        self.oxygen = oxygen
-        self.production = 5
-        self.is_ready = False
-        self.collect = Clock.schedule_interval(self.ready, 5)
-
-    def ready(self, *args):
-        """This function switches is_ready to True and cancels the ClockEvent which calls it."""
-        self.is_ready = True
-        self.collect.cancel()
+    def __init__(self, game, **kwargs):
+        Popup.__init__(self, **kwargs)
+        self.game = game
 
-    def collect_oxygen(self):
-        """
-        This function collects oxygen from the tree.
 
-        is_ready is switched back to False and collect is rescheduled.
-        """
-        # Collect oxygen in the oxygen bar
-        self.oxygen.add_oxygen(self.production)
+class PurchasePopup(Popup):
+    """
+    This class builds the purchasing decision popup, which gives the player the option to spend
+    oxygen in exchange for planting a tree on an empty grass tile. It is built once and the
+    price is updated every time it is opened.
 
-        # Increase tree production
-        if self.production < 10:
-            self.production += 1
+    Attributes
+    ----------
+    price: Integer
+           The price of the tree, shown on the popup.
+    grid: TileGrid
+           The grid the popup was opened from. Needed to purchase the tree.
+    """
+    def __init__(self, grid, **kwargs):
+        Popup.__init__(self, **kwargs)
+        self.grid = grid
 
-        # Restart the collection process
-        self.is_ready = False
-        self.collect()
 
-        # Update oxygen bar
-        self.oxygen.update_oxygen()
+class DeclinedPopup(Popup):
+    """This class builds the popup displayed when the purchase of a new tree is declined."""
+    pass
 
 
-class GameOverPopup(Popup):
+class TileButton(Button):
     """
-    This class builds the game over popup.
+    This class is a button on one of the tile grids. Every tile keeps the same buttons for the
+    whole game, and they are updated in place when the tile changes.
 
     Attributes
     ----------
-    game: Game
-          The instance of the game being played.
-          Needed to access the window manager to send the player back to the account page.
+    i: Integer
+       The tile index.
+    shown: Boolean
+       False while the button is hidden. A hidden button lets touches through to the grids below.
     """
-    def __init__(self, game, **kwargs):
-        Popup.__init__(self, **kwargs)
-        self.game = game
+    def __init__(self, i, **kwargs):
+        Button.__init__(self, **kwargs)
+        self.i = i
+        self.shown = True
+
+    def show(self, source, pressed_source=None):
+        """
+        This function shows the button with the given image.
+
+        :param source: source of the image to show
+        :param pressed_source: source of the image to show while pressed, source if not given
+        """
+        self.background_normal = source
+        self.background_down = source if pressed_source is None else pressed_source
+        self.opacity = 1
+        self.shown = True
+
+    def hide(self):
+        """This function hides the button."""
+        self.opacity = 0
+        self.shown = False
+
+    def on_touch_down(self, touch):
+        if not self.shown:
+            return False
+        return Button.on_touch_down(self, touch)
 
 
 class TileGrid(Screen):
     """
     This class manipulates the playable grid.
 
+    The popups are built along with the grid and reopened every time, so that opening one only
+    takes a frame.
+
     Attributes
     ----------
     grid: GridLayout
@@ -349,9 +351,11 @@ class TileGrid(Screen):
     game: Game
           The instance of the game that is being played.
           Needed to access the window manager to send the player back to the account page.
+    engine: Engine
+          The engine running the game's rules. Holds the tile states and the trees.
     oxygen: Oxygen
           The instance of the Oxygen class used when building the final layout.
-          Needed to access and manipulate the current oxygen value.
+          Needed to update the oxygen bar.
     temperature: Temperature
           The instance of the Temperature class used when building the final layout.
           Needed to access the temperature value.
@@ -360,409 +364,409 @@ class TileGrid(Screen):
           Needed to access the day counter.
     score: Score
           The instance of the Score class used when building the final layout.
-          Needed to access the score adding mechanism.
-    flood_used: Boolean
-          Switched to true when flood() is called. Used to give the flood() function a cooldown.
-    reclaim_used: Boolean
-          Switched to true when reclaim() is called. Used to give the reclaim() function a
-          cooldown.
-    tree_num: Integer
-          Number of trees in the grid.
-    tree_price: Integer
-          (Oxygen) Cost of purchasing a tree.
-    confirm_purchase_popup: Popup
+          Needed to update the score display.
+    confirm_purchase_popup: PurchasePopup
           The popup displayed when clicking on an empty grass tile. Gives player the option to
           spend oxygen in exchange for planting a tree on that tile.
-    declined: Popup
+    declined: DeclinedPopup
           The popup displayed when the purchase of a new tree is declined (not enough oxygen).
-    game_over_popup: Popup
+    game_over_popup: GameOverPopup
           The popup displayed when the player loses.
-    tree_production: List
-          A list of OakTree objects.
-          Represents all the trees in the grid.
-    tiles: List
-          A list of integers. Its size is the grid's rows * columns. Each value in the list
-          represents a separate tile state. 0 for grass (empty land to plant trees in), 1 for
-          oak_tree (land with oak tree), 2 for water (unusable space) and 3 for locked water
-          (water level cannot go below what it is on the starting grid).
-    flood_cooldown: ClockEvent
-          When at least one tile floods with the flood function, this attribute is used to create
-          a minimum cooldown between this and the next time flood can be called again.
-    reclaim_cooldown: ClockEvent
-          When at least one tile is reclaimed with the reclaim function, this attribute is used to
-          create a minimum cooldown between this and the next time reclaim can be called again.
-    flood_check: ClockEvent
-          Calls the flood function at the specified time interval to flood the grid.
-    reclaim_check: ClockEvent
-          Calls the reclaim function at the specified time interval to reclaim land previously
-          flooded in the grid.
-    reload_production_event: ClockEvent
-          Calls the reload_production function at the specified time interval to refresh the
-          production grid.
+    purchase_index: Integer
+          The index of the tile the purchasing decision popup was opened for.
+    tile_buttons: List
+          The TileButton of every tile on the main grid, indexed by tile.
+    tree_buttons: List
+          The TileButton of every tile on the tree grid, indexed by tile.
+    production_buttons: List
+          The TileButton of every tile on the production grid, indexed by tile.
     """
     grid = ObjectProperty(None)
     trees = ObjectProperty(None)
     production = ObjectProperty(None)
 
-    def __init__(self, game, oxygen, temperature, day, score, **kwargs):
+    def __init__(self, game, engine, oxygen, temperature, day, score, **kwargs):
+        # The kv rule builds the grids as soon as they are assigned, which needs the engine
+        self.engine = engine
+        self.tile_buttons = []
+        self.tree_buttons = []
+        self.production_buttons = []
         Screen.__init__(self, **kwargs)
         self.game = game
         self.oxygen = oxygen
         self.temperature = temperature
         self.day = day
         self.score = score
-        self.flood_used = False
-        self.reclaim_used = False
-        self.tree_num = 1
-        self.tree_price = self.tree_num * 3
-        self.confirm_purchase_popup = None
-        self.declined = None
-        self.game_over_popup = None
-        self.tree_production = [OakTree(19, self.oxygen)]
-        self.tiles = [
-            0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3, 3,
-            0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 3, 3, 3,
-            0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3, 3, 3, 3,
-            0, 0, 0, 0, 0, 0, 0, 0, 3, 3, 3, 3, 3, 3
-        ]
-        self.flood_cooldown = None
-        self.reclaim_cooldown = None
-        self.flood_check = Clock.schedule_interval(self.flood, 2)
-        self.reclaim_check = Clock.schedule_interval(self.reclaim, 2)
-        self.reload_production_event = Clock.schedule_interval(self.reload_production_grid, 1)
+        self.confirm_purchase_popup = PurchasePopup(self)
+        self.declined = DeclinedPopup()
+        self.game_over_popup = GameOverPopup(game)
+        self.purchase_index = None
 
     def on_grid(self, *args):
         """
-        This function builds the grid layout for the tiles.
+        This function builds the grid layout for the tiles, with one button per tile.
+
+        Grass tiles are clickable (possible to purchase a tree from). Tiles with an oak tree show
+        grass but cannot be clicked, and water tiles show water.
+        """
+        self.tile_buttons = self.build_layout(self.grid, self.tile_buttons)
+        for button in self.tile_buttons:
+            button.bind(on_press=self.tile_pressed)
+            self.update_tile(button.i)
+
+    def on_trees(self, *args):
+        """
+        This function builds the grid layout for the trees, with one button per tile.
+
+        The button is only shown if there is an oak tree on the tile. Otherwise it is hidden so
+        that it does not interfere with the buttons on the main grid.
+        """
+        self.tree_buttons = self.build_layout(self.trees, self.tree_buttons)
+        for button in self.tree_buttons:
+            self.update_tree(button.i)
 
-        If the tile state specified in self.tiles is equal to 0, a clickable (possible to purchase
-        a tree from) grass tile is placed.
+    def on_production(self, *args):
+        """
+        This function builds the grid layout for the oxygen collection, with one button per tile.
+
+        The button is only shown if there is an Oak tree on the tile and it is ready to collect
+        from, to allow the user to collect oxygen.
+        """
+        self.production_buttons = self.build_layout(self.production, self.production_buttons)
+        for button in self.production_buttons:
+            button.bind(on_release=self.production_pressed)
+            self.update_production(button.i)
+
+    def build_layout(self, layout, old_buttons):
+        """
+        This function sizes one of the grid layouts to the engine's grid and fills it with a
+        button for every tile, replacing the buttons already on it.
+
+        :param layout: the GridLayout to build
+        :param old_buttons: the buttons currently on the layout
+
+        :return buttons: the buttons, indexed by tile
+        """
+        for button in old_buttons:
+            layout.remove_widget(button)
+
+        layout.rows = self.engine.board.rows
+        layout.cols = self.engine.board.cols
+
+        buttons = []
+        for i in range(len(self.engine.board)):
+            button = TileButton(i)
+            layout.add_widget(button)
+            buttons.append(button)
+
+        return buttons
+
+    def build_grids(self):
+        """This function rebuilds all three grid layouts, for a board of a different size."""
+        self.on_grid()
+        self.on_trees()
+        self.on_production()
+
+    def tile_count(self):
+        """This function returns the number of tiles the grids were built for."""
+        return len(self.tile_buttons)
+
+    def update_tile(self, i):
+        """
+        This function updates the main grid's button of a tile.
+
+        :param i: the tile index
+        """
+        if self.engine.board[i] == TileBoard.GRASS:
+            self.tile_buttons[i].show(image("grass"), image("grass_pressed"))
+        elif self.engine.board[i] == TileBoard.TREE:
+            self.tile_buttons[i].show(image("grass"))
+        else:
+            self.tile_buttons[i].show(image("water"))
+
+    def update_tree(self, i):
+        """
+        This function updates the tree grid's button of a tile.
+
+        :param i: the tile index
+        """
+        if self.engine.board[i] == TileBoard.TREE:
+            self.tree_buttons[i].show(image("oak_tree"))
+        else:
+            self.tree_buttons[i].hide()
 
-        If it is equal to 1 (there is an oak tree there), a non-clickable grass tile is placed.
+    def update_production(self, i):
+        """
+        This function updates the production grid's button of a tile.
 
-        If it is equal to 2 or 3(there is water there), a non-clickable water tile is placed.
+        :param i: the tile index
+        """
+        tree = self.find_tree(i)
+        if tree is not None and tree.is_ready:
+            self.production_buttons[i].show(image("oxygen_bubble"))
+        else:
+            self.production_buttons[i].hide()
 
-        :var lost: if all tiles are water then lost is true and game_over() is called.
+    def refresh_tiles(self):
+        """
+        This function updates the buttons of the tiles that changed since the last refresh,
+        leaving every other button as it is. The game is over once every tile is flooded.
         """
-        lost = True
+        for i in self.engine.dirty:
+            self.update_tile(i)
+            self.update_tree(i)
+            self.update_production(i)
+
+        self.engine.dirty.clear()
 
-        for i in range(0, 56):
-            if self.tiles[i] == 0:
-                self.grid.add_widget(Button(background_normal="Game/Assets/grass.png",
-                                            background_down="Game/Assets/grass_pressed.png",
-                                            on_press=partial(self.purchase_popup, i)))
-                lost = False
-            elif self.tiles[i] == 1:
-                self.grid.add_widget(Button(background_normal="Game/Assets/grass.png",
-                                            background_down="Game/Assets/grass.png"))
-                lost = False
-            elif self.tiles[i] == 2 or self.tiles[i] == 3:
-                self.grid.add_widget(Button(background_normal="Game/Assets/water.png",
-                                            background_down="Game/Assets/water.png"))
-        if lost:
+        if self.engine.lost:
             self.game_over()
 
-    def on_trees(self, *args):
+    def find_tree(self, i):
         """
-        This function builds the grid layout for the trees.
+        This function finds the tree planted on a tile.
 
-        If the tile state specified in self.tiles is equal to 0 or 2, an empty label is placed
-        (to keep the grid structure but not interfere with the buttons on the main grid).
+        :param i: the tile index
 
-        If it is equal to 1, an oak tree is placed.
+        :return tree: the tree object, or None if there is no tree on the tile
         """
-        for i in range(0, 56):
-            if self.tiles[i] == 0 or self.tiles[i] == 2 or self.tiles[i] == 3:
-                self.trees.add_widget(Label(text=""))
-            elif self.tiles[i] == 1:
-                self.trees.add_widget(Button(background_normal="Game/Assets/oak_tree.png",
-                                             background_down="Game/Assets/oak_tree.png"))
+        return self.engine.trees.get(i)
 
-    def on_production(self, *args):
+    def tile_pressed(self, button):
         """
-        This function builds the grid layout for the oxygen collection.
+        This function is called when a tile on the main grid is pressed. Grass tiles open the
+        purchasing decision popup.
 
-        If the tile state specified in self.tiles is equal to 0 or 2, an empty label is placed
-        (to keep the grid structure but not interfere with the buttons on the main grid).
+        :param button: the tile's button
+        """
+        if self.engine.board[button.i] == TileBoard.GRASS:
+            self.purchase_popup(button.i)
 
-        If it is equal to 1 ie there is an Oak tree there, and it is ready to collect from, a
-        button is placed to allow the user to collect oxygen.
+    def production_pressed(self, button):
         """
-        for i in range(0, 56):
-            if self.tiles[i] == 0 or self.tiles[i] == 2 or self.tiles[i] == 3:
-                self.production.add_widget(Label(text=""))
-            elif self.tiles[i] == 1:
-                added = False
-                for tree in self.tree_production:
-                    if tree.i == i and tree.is_ready:
-                        self.production.add_widget(Button(background_normal="Game/Assets/oxygen_bubble.png",
-                                                          background_down="Game/Assets/oxygen_bubble.png",
-                                                          on_release=partial(self.collection_event, tree)))
-                        added = True
-                if not added:
-                    self.production.add_widget(Label(text=""))
+        This function is called when a production button is clicked.
+
+        :param button: the tile's button
+        """
+        tree = self.find_tree(button.i)
+        if tree is not None and tree.is_ready:
+            self.collection_event(tree)
 
     def collection_event(self, tree, *args):
         """
-        This function is called when a production button is clicked. It calls the tree's
-        collection function, adds score and reloads the production grid.
+        This function collects oxygen from a tree, updates the oxygen bar and score and refreshes
+        the tree's tile.
 
         :param tree: the tree object to collect from
         """
-        tree.collect_oxygen()
-        self.score.add_score(1)
-        self.reload_production_grid()
-
-    def reload_production_grid(self, *args):
-        """This function reloads the production grid."""
-        self.production.clear_widgets()
-        self.on_production()
+        self.engine.collect_oxygen(tree)
+        self.oxygen.update_oxygen()
+        self.score.update_score()
+        self.refresh_tiles()
 
     def purchase_popup(self, i, *args):
         """
-        This function generates the purchasing decision popup.
+        This function opens the purchasing decision popup with the current tree price.
 
         :param i: the tile index
+        """
+        self.purchase_index = i
 
-        :var pos: a global variable equal to i so that the purchase_tree() function can access it
-        """
-        global pos
-        pos = i
-
-        self.confirm_purchase_popup = Popup(size_hint_x=0.5,
-                                            size_hint_y=0.5,
-                                            title="")
-
-        # Build popup layout
-        box1 = BoxLayout(orientation="horizontal",
-                         size_hint_x=0.3,
-                         pos_hint={"center_x": 0.5, "center_y": 0.5})
-        box1.add_widget(Image(source="Game/Assets/oxygen_bubble.png",
-                              size_hint=(2, 2),
-                              pos_hint={"center_x": 0.5, "center_y": 0.5}))
-        box1.add_widget(Label(text=str(self.tree_price),
-                              font_size=48,
-                              bold=True))
-
-        box2 = BoxLayout(orientation="horizontal")
-        box2.add_widget(Button(size_hint_y=0.6,
-                               text="Yes",
-                               on_release=self.purchase_tree))
-        box2.add_widget(Button(size_hint_y=0.6,
-                               text="No",
-                               on_release=self.confirm_purchase_popup.dismiss))
-
-        box = BoxLayout(orientation="vertical")
-        box.add_widget(Label(text="Would you like to purchase a tree in this tile?"))
-        box.add_widget(box1)
-        box.add_widget(box2)
-
-        # Add layout to popup and open
-        self.confirm_purchase_popup.add_widget(box)
+        self.confirm_purchase_popup.price = self.engine.tree_price
         self.confirm_purchase_popup.open()
 
     def purchase_tree(self, *args):
         """
-        This function handles the transaction of purchasing a tree.
+        This function handles the transaction of purchasing a tree, on the tile the purchasing
+        decision popup was opened for.
+        """
+        self.confirm_purchase_popup.dismiss()
 
-        :var pos: global variable from purchase_popup() to access tile index
+        # The game goes on while the popup is open, so the tile may have flooded since
+        if self.engine.board[self.purchase_index] != TileBoard.GRASS:
+            self.refresh_tiles()
+            return
+
+        if self.engine.purchase_tree(self.purchase_index):
+            # Update oxygen bar, score and the tile
+            self.oxygen.update_oxygen()
+            self.score.update_score()
+            self.refresh_tiles()
+        else:
+            self.declined.open()
+
+    def game_over(self):
         """
-        if Resources.oxygen_value >= self.tree_price:
-            # Spend oxygen
-            Resources.oxygen_value -= self.tree_price
+        This function opens the game over popup. The game is merged into the player's score
+        record on the account page, and the record is queued to be sent to the backend.
+        """
+        self.game.pause()
+
+        account_screen = self.game.manager.account_screen
+        if account_screen.score_record is not None:
+            state = self.engine.state
+            updated_score = account_screen.record_game(state.score, state.days, datetime.now())
+            account_screen.store.update_score(account_screen.username, updated_score, self.engine.events.to_bytes(),
+                                              self.engine.scheduler.steps)
 
-            # Update tile state
-            self.tiles[pos] = 1
-            self.tree_production.append(OakTree(pos, self.oxygen))
+        self.game_over_popup.open()
 
-            # Add oxygen cap
-            if Resources.oxygen_cap < 200:
-                Resources.oxygen_cap += 5
-                self.oxygen.update_oxygen()
 
-            # Update number of trees
-            self.tree_num += 1
+class CanvasTileGrid(TileGrid):
+    """
+    This class manipulates the playable grid like TileGrid, but draws it straight onto its canvas
+    instead of using a widget per tile. Every tile has a textured Rectangle for its ground, its
+    tree and its oxygen bubble, and touches are mapped to the tile under them. There is no
+    layout to recompute, however large the board is.
 
-            # Calculate new tree price
-            self.calculate_tree_price()
+    Attributes
+    ----------
+    textures: Dictionary
+          The textures of the tile images, by image name.
+    tile_rects: List
+          The Rectangle drawing the ground of every tile, indexed by tile.
+    tree_rects: List
+          The Rectangle drawing the tree of every tile, indexed by tile.
+    bubble_rects: List
+          The Rectangle drawing the oxygen bubble of every tile, indexed by tile.
+    """
+    # Layout of the drawing, matching the grid layouts of TileGrid
+    TREE_OFFSET = 0.07
+    BUBBLE_PADDING = (20, 40)
+    BUBBLE_SPACING = (45, 100)
+
+    def __init__(self, *args, **kwargs):
+        self.textures = {}
+        self.tile_rects = []
+        self.tree_rects = []
+        self.bubble_rects = []
+        TileGrid.__init__(self, *args, **kwargs)
+
+        for name in ("grass", "water", "oak_tree", "oxygen_bubble"):
+            self.textures[name] = CoreImage(image(name)).texture
+
+        self.build_grids()
+        self.bind(pos=self.draw_tiles, size=self.draw_tiles)
+
+    def build_grids(self):
+        """This function creates the drawing instructions of every tile."""
+        self.canvas.clear()
+        self.tile_rects = []
+        self.tree_rects = []
+        self.bubble_rects = []
+
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            for rects in (self.tile_rects, self.tree_rects, self.bubble_rects):
+                for i in range(len(self.engine.board)):
+                    rects.append(Rectangle(size=(0, 0)))
+
+        self.draw_tiles()
+
+    def tile_count(self):
+        """This function returns the number of tiles the drawing instructions were made for."""
+        return len(self.tile_rects)
+
+    def draw_tiles(self, *args):
+        """This function redraws every tile, after the grid is built, moved or resized."""
+        for i in range(len(self.tile_rects)):
+            self.update_tile(i)
+            self.update_tree(i)
+            self.update_production(i)
+
+    def tile_size(self):
+        """This function returns the width and height of a tile."""
+        return self.width / self.engine.board.cols, self.height / self.engine.board.rows
+
+    def tile_pos(self, i):
+        """
+        This function finds the bottom left corner of a tile.
 
-            # Gain score
-            self.score.add_score(5)
+        :param i: the tile index
+        """
+        row, col = divmod(i, self.engine.board.cols)
+        width, height = self.tile_size()
+        return self.x + col * width, self.y + (self.engine.board.rows - 1 - row) * height
 
-            self.confirm_purchase_popup.dismiss()
+    def bubble_rect(self, i):
+        """
+        This function finds where a tile's oxygen bubble is drawn.
 
-            # Update oxygen bar and rebuild grid
-            self.oxygen.update_oxygen()
-            self.grid.clear_widgets()
-            self.trees.clear_widgets()
-            self.production.clear_widgets()
-            self.on_grid()
-            self.on_trees()
-            self.on_production()
-        else:
-            self.confirm_purchase_popup.dismiss()
+        :param i: the tile index
 
-            self.declined = Popup(size_hint_x=0.25,
-                                  size_hint_y=0.25,
-                                  title="")
+        :return: the bubble's x, y, width and height
+        """
+        rows, cols = self.engine.board.rows, self.engine.board.cols
+        row, col = divmod(i, cols)
+        padding_x, padding_y = CanvasTileGrid.BUBBLE_PADDING
+        spacing_x, spacing_y = CanvasTileGrid.BUBBLE_SPACING
+
+        width = max((self.width - 2 * padding_x - (cols - 1) * spacing_x) / cols, 0)
+        height = max((self.height - 2 * padding_y - (rows - 1) * spacing_y) / rows, 0)
+        x = self.x + padding_x + col * (width + spacing_x)
+        y = self.y + padding_y + (rows - 1 - row) * (height + spacing_y)
+        return x, y, width, height
+
+    def update_tile(self, i):
+        """
+        This function redraws the ground of a tile.
 
-            # Build popup layout
-            box = BoxLayout(orientation="vertical")
-            box.add_widget(Label(text="You do not have enough oxygen!"))
-            box.add_widget(Button(text="Close",
-                                  size_hint_y=0.27,
-                                  on_release=self.declined.dismiss))
+        :param i: the tile index
+        """
+        rect = self.tile_rects[i]
+        rect.texture = self.textures["water" if self.engine.board[i] >= TileBoard.WATER else "grass"]
+        rect.pos = self.tile_pos(i)
+        rect.size = self.tile_size()
 
-            # Add layout to popup and open
-            self.declined.add_widget(box)
-            self.declined.open()
+    def update_tree(self, i):
+        """
+        This function redraws the tree of a tile, hiding it if there is no tree.
 
-    def calculate_tree_price(self):
-        """This function calculates the price of purchasing a new tree."""
-        self.tree_price = self.tree_num * 3
-
-    def flood(self, *args):
-        """
-        This function changes grass tiles into water tiles when temperature is above 50.
-
-        Each tile adjacent to a water tile has a 15% chance to be flooded.
-        """
-        if self.temperature.temperature > 50:
-            for i in range(0, 56):
-                if self.tiles[i] == 2 or self.tiles[i] == 3:
-                    adjacent_indexes = self.discover_adjacent_tiles(i)
-                    # Iterate through all adjacent tiles
-                    for index in adjacent_indexes:
-                        # 15% chance
-                        if random.randrange(101) < 15:
-                            if self.tiles[index] == 1:
-                                # Find self.tree_production element to remove
-                                tree_production = []
-                                for j in range(len(self.tree_production)):
-                                    if self.tree_production[j].i != index:
-                                        tree_production.append(self.tree_production[j])
-
-                                self.tree_production = tree_production
-
-                            if self.tiles[index] != 2 and self.tiles[index] != 3:
-                                self.tiles[index] = 2
-                                self.score.add_score(-5)
-                                self.flood_used = True
-
-            # Cooldown
-            if self.flood_used:
-                self.flood_check.cancel()
-                self.flood_cooldown = Clock.schedule_once(self.reset_flood, 10)
-
-            self.grid.clear_widgets()
-            self.trees.clear_widgets()
-            self.production.clear_widgets()
-            self.on_grid()
-            self.on_trees()
-            self.on_production()
-
-    def reset_flood(self, *args):
-        """This function reschedules the flood_check ClockEvent."""
-        self.flood_used = False
-        self.flood_check()
-
-    def reclaim(self, *args):
-        """
-        This function changes water tiles into grass tiles when temperature is equal or below 32.
-
-        Each tile adjacent to a grass tile has a 20% chance to be reclaimed.
-        """
-        if self.temperature.temperature < 32.1:
-            for i in range(0, 56):
-                if self.tiles[i] == 0 or self.tiles[i] == 1:
-                    adjacent_indexes = self.discover_adjacent_tiles(i)
-                    # Iterate through all adjacent tiles
-                    for index in adjacent_indexes:
-                        # 20% chance
-                        if random.randrange(101) < 20:
-                            if self.tiles[index] == 2:
-                                self.tiles[index] = 0
-                                self.score.add_score(15)
-                                self.reclaim_used = True
-
-            # Cooldown
-            if self.reclaim_used:
-                self.reclaim_check.cancel()
-                self.reclaim_cooldown = Clock.schedule_once(self.reset_reclaim, 10)
-
-            self.grid.clear_widgets()
-            self.trees.clear_widgets()
-            self.production.clear_widgets()
-            self.on_grid()
-            self.on_trees()
-            self.on_production()
-
-    def reset_reclaim(self, *args):
-        """This function reschedules the reclaim_check ClockEvent."""
-        self.reclaim_used = True
-        self.reclaim_check()
-
-    @staticmethod
-    def discover_adjacent_tiles(i):
-        """This function discovers the adjacent tile indexes of a given tile index."""
-        adjacent_indexes = []
-        if i == 0:
-            adjacent_indexes = [i + 1, i + 15, i + 14]
-        elif 0 < i < 13:
-            adjacent_indexes = [i + 1, i + 15, i + 14, i + 13, i - 1]
-        elif i == 13:
-            adjacent_indexes = [i + 14, i + 13, i - 1]
-        elif i in (14, 28):
-            adjacent_indexes = [i + 1, i + 15, i + 14, i - 14, i - 13]
-        elif 14 < i < 27 or 28 < i < 41:
-            adjacent_indexes = [i - 1, i - 15, i - 14, i - 13, i + 1, i + 15, i + 14, i + 13]
-        elif i in (27, 41):
-            adjacent_indexes = [i + 14, i + 13, i - 1, i - 15, i - 14]
-        elif i == 42:
-            adjacent_indexes = [i + 1, i - 14, i - 13]
-        elif 42 < i < 55:
-            adjacent_indexes = [i + 1, i - 1, i - 15, i - 14, i - 13]
-
-        return adjacent_indexes
+        :param i: the tile index
+        """
+        rect = self.tree_rects[i]
+        if self.engine.board[i] == TileBoard.TREE:
+            x, y = self.tile_pos(i)
+            rect.texture = self.textures["oak_tree"]
+            rect.pos = x, y + self.height * CanvasTileGrid.TREE_OFFSET
+            rect.size = self.tile_size()
+        else:
+            rect.size = 0, 0
 
-    def game_over(self):
-        """This function builds and opens the game over popup."""
-        self.game.pause()
+    def update_production(self, i):
+        """
+        This function redraws the oxygen bubble of a tile, hiding it unless its tree is ready.
 
-        score = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.game.manager.account_screen.username}/score').json()
-
-        if Resources.score >= score["high_score"]:
-            updated_score = {
-                "score_username": score["score_username"],
-                "high_score": Resources.score,
-                "date_achieved": datetime.now(),
-                "previous_score": Resources.score,
-                "most_days_lasted": max(Resources.days, score["most_days_lasted"]),
-                "previous_days_lasted": Resources.days
-            }
+        :param i: the tile index
+        """
+        rect = self.bubble_rects[i]
+        tree = self.find_tree(i)
+        if tree is not None and tree.is_ready:
+            x, y, width, height = self.bubble_rect(i)
+            rect.texture = self.textures["oxygen_bubble"]
+            rect.pos = x, y
+            rect.size = width, height
         else:
-            updated_score = {
-                "score_username": score["score_username"],
-                "high_score": score["high_score"],
-                "date_achieved": score["date_achieved"],
-                "previous_score": Resources.score,
-                "most_days_lasted": max(Resources.days, score["most_days_lasted"]),
-                "previous_days_lasted": Resources.days
-            }
+            rect.size = 0, 0
 
-        requests.put(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.game.manager.account_screen.username}/update/score', data=updated_score).json()
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return False
 
-        score = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.game.manager.account_screen.username}/score').json()
-        self.game.manager.account_screen.username = score["score_username"]
-        self.game.manager.account_screen.high_score = score["high_score"]
-        self.game.manager.account_screen.most_days = score["most_days_lasted"]
-        self.game.manager.account_screen.previous_score = score["previous_score"]
-        self.game.manager.account_screen.previous_days = score["previous_days_lasted"]
+        # Find the tile under the touch
+        width, height = self.tile_size()
+        col = min(int((touch.x - self.x) / width), self.engine.board.cols - 1)
+        row = self.engine.board.rows - 1 - min(int((touch.y - self.y) / height), self.engine.board.rows - 1)
+        i = row * self.engine.board.cols + col
 
-        self.manager.scoreboard.refresh_scoreboard()
+        tree = self.find_tree(i)
+        x, y, bubble_width, bubble_height = self.bubble_rect(i)
+        if tree is not None and tree.is_ready and x <= touch.x <= x + bubble_width and y <= touch.y <= y + bubble_height:
+            self.collection_event(tree)
+        elif self.engine.board[i] == TileBoard.GRASS:
+            self.purchase_popup(i)
 
-        game_over_popup = GameOverPopup(self.game)
-        game_over_popup.open()
+        return True
 
 
 class PauseButton(Screen):
@@ -772,18 +776,117 @@ class PauseButton(Screen):
         self.game = game
 
 
+class ProfilerOverlay(Screen):
+    """
+    This class displays the profiler's summary over the game, and can export everything it
+    recorded. It is only added to the game when profiling is turned on.
+
+    Attributes
+    ----------
+    game: Game
+          The instance of the game being profiled.
+    profiler: Profiler
+          The profiler timing the game.
+    export_path: String
+          The file the profile is exported to.
+    refresh_event: ClockEvent
+          Refreshes the summary while it is shown.
+    """
+    report = ObjectProperty(None)
+
+    # Seconds between two refreshes of the summary
+    REFRESH_INTERVAL = 0.5
+
+    def __init__(self, game, profiler, export_path, **kwargs):
+        Screen.__init__(self, **kwargs)
+        self.game = game
+        self.profiler = profiler
+        self.export_path = export_path
+        self.refresh_event = Clock.schedule_interval(self.refresh, ProfilerOverlay.REFRESH_INTERVAL)
+        self.refresh_event.cancel()
+
+    def toggle(self):
+        """This function shows or hides the summary."""
+        if self.report.opacity:
+            self.report.opacity = 0
+            self.refresh_event.cancel()
+        else:
+            self.report.opacity = 1
+            self.refresh()
+            self.refresh_event()
+
+    def refresh(self, *args):
+        """This function updates the summary."""
+        self.profiler.widgets = sum(1 for _ in self.game.walk())
+        self.report.text = self.profiler.report()
+
+    def export(self):
+        """This function writes everything recorded to the export file."""
+        self.profiler.widgets = sum(1 for _ in self.game.walk())
+        try:
+            self.profiler.export(self.export_path)
+        except OSError:
+            pass
+
+
 class Game(Screen):
-    """This class adds all widgets to a single Screen."""
+    """
+    This class adds all widgets to a single Screen and runs the game loop.
+
+    Attributes
+    ----------
+    tile_grid_type: Class
+          The class used to display the playable grid, TileGrid or CanvasTileGrid if the
+          NO2_CANVAS_GRID environment variable is set.
+    engine: Engine
+          The engine running the game's rules.
+    loop: ClockEvent
+          Steps the engine by the time since the last frame and updates the widgets.
+    loop_interval: Float
+          Seconds between two runs of the loop, 0 to run it every frame.
+    low_power: Boolean
+          True to always run the loop at LOW_POWER_INTERVAL, set by the NO2_LOW_POWER environment
+          variable.
+    last_input: Float
+          When the player last touched the screen.
+    data_dir: String
+          The directory the players' games are saved in.
+    snapshot_path: String
+          The file the signed in player's game is saved to, so they can resume it when they next
+          sign in. None while no player is signed in, and the game is then not saved.
+    since_checkpoint: Float
+          Seconds played since the game was last saved.
+    frame_updates: List
+          The widget updates run after the engine is stepped, on every frame in which the game
+          clock moved or a tile changed.
+    profiler: Profiler
+          Times the engine's rules and the widget updates every frame. None unless the
+          NO2_PROFILE environment variable is set.
+    """
+    tile_grid_type = TileGrid
+
+    # Seconds between two saves of the game while it is played
+    CHECKPOINT_INTERVAL = 5
+
+    # The loop runs every frame while the game is played, and every LOW_POWER_INTERVAL seconds
+    # once the player has not touched the screen for IDLE_AFTER seconds. The engine catches up
+    # on the time in between in one go, so the game plays out the same either way
+    LOW_POWER_INTERVAL = 0.2
+    IDLE_AFTER = 10
+
     def __init__(self, **kwargs):
         Screen.__init__(self, **kwargs)
         # Initialise instances of classes in variables so that they can be passed around
-        self.co2 = CO2()
+        self.engine = Engine()
+        if os.environ.get("NO2_CANVAS_GRID"):
+            self.tile_grid_type = CanvasTileGrid
+        self.co2 = CO2(self.engine)
         self.background = Background(self.co2)
-        self.temperature = Temperature()
-        self.score = Score()
-        self.oxygen = Oxygen(self.co2, self.score)
-        self.day = Day(self.score)
-        self.tilegrid = TileGrid(self, self.oxygen, self.temperature, self.day, self.score)
+        self.temperature = Temperature(self.engine)
+        self.score = Score(self.engine)
+        self.oxygen = Oxygen(self.engine, self.co2, self.score)
+        self.day = Day(self.engine, self.score)
+        self.tilegrid = self.tile_grid_type(self, self.engine, self.oxygen, self.temperature, self.day, self.score)
 
         # Add background
         self.add_widget(self.background)
@@ -805,84 +908,153 @@ class Game(Screen):
         # Add pause button
         self.add_widget(PauseButton(self))
 
+        # A player's saved game is resumed once they sign in, see load_player()
+        app = App.get_running_app()
+        data_dir = app.user_data_dir if app else "."
+        self.data_dir = data_dir
+        self.snapshot_path = None
+        self.since_checkpoint = 0
+
+        self.frame_updates = [
+            self.co2.update_co2,
+            self.oxygen.update_oxygen,
+            self.temperature.update_temperature,
+            self.day.update_day,
+            self.score.update_score,
+            self.tilegrid.refresh_tiles
+        ]
+
+        # Time every frame if profiling is turned on
+        self.profiler = None
+        if os.environ.get("NO2_PROFILE"):
+            self.profiler = Profiler()
+            self.frame_updates = [self.profiler.wrap(update.__name__, update) for update in self.frame_updates]
+            self.checkpoint = self.profiler.wrap("checkpoint", self.checkpoint)
+            self.add_widget(ProfilerOverlay(self, self.profiler, os.path.join(data_dir, "profile.json")))
+
         # Don't run before user goes to game screen
-        self.pause()
+        self.low_power = bool(os.environ.get("NO2_LOW_POWER"))
+        self.last_input = Clock.get_boottime()
+        self.loop_interval = 0
+        self.loop = Clock.schedule_interval(self.update, self.loop_interval)
+        self.loop.cancel()
 
-    def pause(self):
-        """This function pauses the game."""
-        self.co2.add_co2_event.cancel()
-        self.background.sky_change.cancel()
-        self.temperature.add_temp_event.cancel()
-        self.day.increment_day_event.cancel()
-        self.tilegrid.reload_production_event.cancel()
-
-        if self.tilegrid.flood_used:
-            self.tilegrid.flood_cooldown.cancel()
-        else:
-            self.tilegrid.flood_check.cancel()
+    def update(self, dt):
+        """
+        This function steps the engine and updates every widget.
 
-        if self.tilegrid.reclaim_used:
-            self.tilegrid.reclaim_cooldown.cancel()
-        else:
-            self.tilegrid.reclaim_check.cancel()
+        :param dt: seconds since the last frame
+        """
+        if self.profiler is not None:
+            self.profiler.start_frame(dt, self.engine)
+
+        steps = self.engine.step(dt)
+
+        self.since_checkpoint += dt
+        if self.since_checkpoint >= Game.CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+        # Inputs update the widgets they change themselves, so nothing else can have changed
+        if steps or self.engine.dirty:
+            for update in self.frame_updates:
+                update()
+
+        if self.profiler is not None:
+            self.profiler.end_frame()
+
+        if self.low_power or Clock.get_boottime() - self.last_input >= Game.IDLE_AFTER:
+            self.set_loop_interval(Game.LOW_POWER_INTERVAL)
+
+    def on_touch_down(self, touch):
+        # Run every frame again as soon as the player comes back
+        self.last_input = Clock.get_boottime()
+        if not self.low_power:
+            self.set_loop_interval(0)
+        return Screen.on_touch_down(self, touch)
+
+    def set_loop_interval(self, interval):
+        """
+        This function changes how often the game loop runs, keeping it stopped if it is.
+
+        :param interval: seconds between two runs of the loop, 0 to run it every frame
+        """
+        if interval == self.loop_interval:
+            return
+
+        running = self.loop.is_triggered
+        self.loop.cancel()
+        self.loop = Clock.schedule_interval(self.update, interval)
+        self.loop_interval = interval
+        if not running:
+            self.loop.cancel()
+
+    def pause(self):
+        """This function pauses the game and saves it."""
+        self.loop.cancel()
+        self.checkpoint()
 
     def resume(self):
         """This function resumes the game."""
-        self.co2.add_co2_event()
-        self.background.sky_change()
-        self.temperature.add_temp_event()
-        self.day.increment_day_event()
-        self.tilegrid.reload_production_event()
-
-        if self.tilegrid.flood_used:
-            self.tilegrid.flood_cooldown()
-        else:
-            self.tilegrid.flood_check()
+        self.last_input = Clock.get_boottime()
+        self.loop()
 
-        if self.tilegrid.reclaim_used:
-            self.tilegrid.reclaim_cooldown()
-        else:
-            self.tilegrid.reclaim_check()
+    def load_player(self, username):
+        """
+        This function resumes the game a player saved, or starts a new one if they have none.
+        Every player has their own save, so players sharing a device never play on with each
+        other's games.
+
+        :param username: the signed in player's username
+        """
+        snapshot_path = os.path.join(self.data_dir, f"game-{quote(username, safe='')}.snapshot")
+        if snapshot_path == self.snapshot_path:
+            return
+
+        self.snapshot_path = snapshot_path
+        self.since_checkpoint = 0
+        if not Snapshot.read(self.engine, self.snapshot_path):
+            self.engine.reset()
+        self.refresh_widgets()
+
+    def unload_player(self):
+        """
+        This function clears the board when the player signs out. Their game was saved when they
+        left the game screen, so it is left as it is for them to resume.
+        """
+        self.snapshot_path = None
+        self.engine.reset()
+        self.refresh_widgets()
+
+    def checkpoint(self):
+        """This function saves the game, or deletes the save once the game is lost."""
+        self.since_checkpoint = 0
+        if self.snapshot_path is None:
+            return
+
+        try:
+            if self.engine.lost:
+                os.remove(self.snapshot_path)
+            else:
+                Snapshot.write(self.engine, self.snapshot_path)
+        except OSError:
+            # The game can go on without being saved
+            pass
 
     def reset_game(self):
         """This function resets the game."""
-        Resources.reset_resources()
+        self.engine.reset()
+        self.refresh_widgets()
+        self.checkpoint()
 
+    def refresh_widgets(self):
+        """This function updates every widget to the engine's game, after it is reset or restored."""
         self.oxygen.update_oxygen()
         self.co2.update_co2()
 
-        self.temperature.temperature = Resources.temperature
-        self.score.score = Resources.score
-        self.day.days = Resources.days
-
-        self.tilegrid.oxygen = self.oxygen
-        self.tilegrid.temperature = self.temperature
-        self.tilegrid.day = self.day
-        self.tilegrid.score = self.score
-
-        self.tilegrid.flood_used = False
-        self.tilegrid.reclaim_used = False
-        self.tilegrid.tree_num = 1
-        self.tilegrid.tree_price = self.tilegrid.tree_num * 3
-        self.tilegrid.confirm_purchase_popup = None
-        self.tilegrid.declined = None
-        self.tilegrid.game_over_popup = None
-        self.tilegrid.tree_production = [OakTree(19, self.tilegrid.oxygen)]
-        self.tilegrid.tiles = [
-            0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3, 3,
-            0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 3, 3, 3,
-            0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 3, 3, 3, 3,
-            0, 0, 0, 0, 0, 0, 0, 0, 3, 3, 3, 3, 3, 3
-        ]
-        self.tilegrid.flood_cooldown = None
-        self.tilegrid.reclaim_cooldown = None
-        self.tilegrid.flood_check = Clock.schedule_interval(self.tilegrid.flood, 0.03)
-        self.tilegrid.reclaim_check = Clock.schedule_interval(self.tilegrid.reclaim, 2)
-        self.tilegrid.reload_production_event = Clock.schedule_interval(self.tilegrid.reload_production_grid, 1)
-
-        self.tilegrid.grid.clear_widgets()
-        self.tilegrid.trees.clear_widgets()
-        self.tilegrid.production.clear_widgets()
-        self.tilegrid.on_grid()
-        self.tilegrid.on_trees()
-        self.tilegrid.on_production()
+        self.temperature.temperature = self.engine.state.temperature
+        self.score.score = self.engine.state.score
+        self.day.days = self.engine.state.days
+
+        if self.tilegrid.tile_count() != len(self.engine.board):
+            self.tilegrid.build_grids()
+        self.tilegrid.refresh_tiles()
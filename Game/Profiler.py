@@ -0,0 +1,186 @@
+"""Opt-in timing of everything the game screen runs every frame. Nothing in here depends on Kivy."""
+
+# IMPORTS
+import json
+import time
+
+
+class Histogram:
+    """
+    This class counts durations in buckets that double in size, from 1 microsecond up.
+
+    Attributes
+    ----------
+    buckets: List
+          Bucket k counts the durations of less than 2 ** k microseconds not counted by the
+          buckets before it.
+    count: Integer
+          Number of durations recorded.
+    total: Float
+          Sum of the durations recorded, in seconds.
+    longest: Float
+          The longest duration recorded, in seconds.
+    """
+    BUCKETS = 32
+
+    def __init__(self):
+        self.buckets = [0] * Histogram.BUCKETS
+        self.count = 0
+        self.total = 0
+        self.longest = 0
+
+    def add(self, duration):
+        """
+        This function records a duration.
+
+        :param duration: the duration, in seconds
+        """
+        self.buckets[min(int(duration * 1000000).bit_length(), Histogram.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += duration
+        if duration > self.longest:
+            self.longest = duration
+
+    def percentile(self, fraction):
+        """
+        This function estimates a percentile of the durations, by the upper bound of the bucket
+        it falls in.
+
+        :param fraction: the percentile, between 0 and 1
+
+        :return: the estimate, in seconds, never more than the longest duration
+        """
+        rank = fraction * self.count
+        seen = 0
+        for k, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(2 ** k / 1000000, self.longest)
+        return self.longest
+
+    def to_dict(self):
+        """This function returns the histogram in a form that can be written as JSON."""
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "max_ms": self.longest * 1000,
+            "buckets_us": {f"<{2 ** k}": count for k, count in enumerate(self.buckets) if count}
+        }
+
+
+class Profiler:
+    """
+    This class times the callbacks run each frame and the frames themselves.
+
+    Callbacks are timed by wrapping them, so nothing is timed unless a profiler is created. The
+    engine's periodic rules are wrapped in place, again whenever the engine is reset.
+
+    Attributes
+    ----------
+    histograms: Dictionary
+          A Histogram of the durations of every callback, by name. "frame" holds the time
+          between two frames and "update" the time taken by a whole frame's update.
+    widgets: Integer
+          Number of widgets on the game screen, as last counted.
+    scheduler: Scheduler
+          The scheduler whose tasks are wrapped.
+    frame_start: Float
+          When the current frame's update started.
+    """
+    def __init__(self):
+        self.histograms = {}
+        self.widgets = 0
+        self.scheduler = None
+        self.frame_start = 0
+
+    def histogram(self, name):
+        """
+        This function finds a callback's histogram, creating it the first time.
+
+        :param name: the callback's name
+
+        :return: the histogram
+        """
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def wrap(self, name, callback):
+        """
+        This function wraps a callback so that every call to it is timed.
+
+        :param name: the name to record the callback under
+        :param callback: the callback
+
+        :return timed: the wrapped callback
+        """
+        histogram = self.histogram(name)
+        clock = time.perf_counter
+
+        def timed(*args):
+            start = clock()
+            result = callback(*args)
+            histogram.add(clock() - start)
+            return result
+
+        return timed
+
+    def instrument(self, engine):
+        """
+        This function wraps the engine's periodic rules, unless they already are.
+
+        :param engine: the engine
+        """
+        if engine.scheduler is self.scheduler:
+            return
+
+        self.scheduler = engine.scheduler
+        self.scheduler.integrate = self.wrap("integrate", self.scheduler.integrate)
+        for task in self.scheduler.tasks.values():
+            task.callback = self.wrap(task.name, task.callback)
+
+    def start_frame(self, dt, engine):
+        """
+        This function starts timing a frame.
+
+        :param dt: seconds since the last frame
+        :param engine: the engine about to be stepped
+        """
+        self.instrument(engine)
+        self.histogram("frame").add(dt)
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """This function finishes timing a frame."""
+        self.histogram("update").add(time.perf_counter() - self.frame_start)
+
+    def report(self, lines=8):
+        """
+        This function summarises the slowest callbacks.
+
+        :param lines: the number of callbacks to list
+
+        :return: the summary, one callback per line
+        """
+        callbacks = sorted(self.histograms.items(), key=lambda item: item[1].total, reverse=True)
+        text = [f"{'callback':<20}{'calls':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, histogram in callbacks[:lines]:
+            if histogram.count:
+                text.append(f"{name:<20}{histogram.count:>8}{histogram.total / histogram.count * 1000:>10.3f}"
+                            f"{histogram.percentile(0.95) * 1000:>10.3f}{histogram.longest * 1000:>10.3f}")
+        text.append(f"widgets: {self.widgets}")
+        return "\n".join(text)
+
+    def export(self, path):
+        """
+        This function writes everything recorded to a JSON file.
+
+        :param path: the file to write to
+        """
+        with open(path, "w") as file:
+            json.dump({
+                "widgets": self.widgets,
+                "callbacks": {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+            }, file, indent=4)
@@ -0,0 +1,162 @@
+"""An event-driven scheduler which runs all of the game's periodic rules on a single game clock."""
+
+
+class Task:
+    """
+    This class represents a callback run by the Scheduler at a fixed interval.
+
+    Attributes
+    ----------
+    name: String
+          The name the task is registered under.
+    interval: Float
+          Seconds between two runs of the callback.
+    callback: Callable
+          Called with the interval every time the task runs.
+    timestep: Float
+          Length of a step of the scheduler running the task, in seconds.
+    period: Integer
+          Steps between two runs of the callback, the interval rounded to whole steps.
+    due: Integer
+          The step the task next runs at.
+    """
+    def __init__(self, name, interval, callback, timestep, due):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.timestep = timestep
+        self.period = max(round(interval / timestep), 1)
+        self.due = due + self.period
+
+    def delay(self, seconds):
+        """
+        This function pushes the next run of the task back.
+
+        :param seconds: how many seconds to delay the task by
+        """
+        self.due += round(seconds / self.timestep)
+
+
+class Scheduler:
+    """
+    This class keeps the game clock and runs every task that falls due, in the order the tasks
+    were added. The clock counts whole steps, so the tasks run at the same steps however often
+    and however irregularly it is advanced. Time only moves forward through advance() and run(),
+    so nothing runs while the scheduler is paused or not being advanced.
+
+    The clock jumps straight from one task to the next, so advancing it by an hour costs no more
+    than the tasks that fall due in that hour. Whatever changes continuously in between is
+    brought up to date by the integrate callback every time the clock moves.
+
+    Attributes
+    ----------
+    timestep: Float
+          Length of a single step, in seconds.
+    integrate: Callable
+          Called with the number of steps the clock moved forward by, after it moved and before
+          any task due at the new step runs. Can be None.
+    tasks: Dictionary
+          The tasks, by name.
+    accumulator: Float
+          Seconds advanced that do not yet add up to a whole step.
+    time: Float
+          Game time, in seconds, that has been stepped through.
+    steps: Integer
+          Number of steps run. Unlike time, it is exact, so it is used to record when things
+          happened.
+    paused: Boolean
+          True while the scheduler ignores advance().
+    """
+    def __init__(self, timestep, integrate=None):
+        self.timestep = timestep
+        self.integrate = integrate
+        self.tasks = {}
+        self.accumulator = 0
+        self.time = 0
+        self.steps = 0
+        self.paused = False
+
+    def add(self, name, interval, callback):
+        """
+        This function adds a task to the scheduler, first due one interval from now.
+
+        :param name: the name to register the task under
+        :param interval: seconds between two runs of the callback
+        :param callback: called with the interval every time the task runs
+
+        :return task: the new task
+        """
+        task = Task(name, interval, callback, self.timestep, self.steps)
+        self.tasks[name] = task
+        return task
+
+    def advance(self, dt):
+        """
+        This function advances the scheduler by dt seconds, running every whole step that fits.
+
+        :param dt: seconds to advance by
+
+        :return: the number of steps run
+        """
+        if self.paused:
+            return 0
+
+        self.accumulator += dt
+        steps = int(self.accumulator / self.timestep)
+        self.accumulator -= steps * self.timestep
+
+        return self.run(steps)
+
+    def run(self, steps):
+        """
+        This function moves the clock forward, running every task that falls due on the way in
+        order. It stops early if a task pauses the scheduler.
+
+        :param steps: the number of steps to move forward by
+
+        :return: the number of steps the clock moved forward by
+        """
+        start = self.steps
+        target = start + steps
+
+        while not self.paused:
+            # The soonest task, or the first added of those due at the same step
+            task = min(self.tasks.values(), key=lambda task: task.due, default=None)
+            if task is None or task.due > target:
+                self.move(target)
+                break
+
+            self.move(task.due)
+            task.due += task.period
+            task.callback(task.interval)
+
+        return self.steps - start
+
+    def tick(self):
+        """This function runs a single step and every task that falls due in it."""
+        self.run(1)
+
+    def move(self, step):
+        """
+        This function moves the clock forward to a step and brings whatever changes continuously
+        up to date.
+
+        :param step: the step to move to
+        """
+        if step <= self.steps:
+            return
+
+        steps = step - self.steps
+        self.steps = step
+        self.time = step * self.timestep
+
+        if self.integrate is not None:
+            self.integrate(steps)
+
+    def pause(self):
+        """This function pauses the scheduler."""
+        self.paused = True
+
+    def resume(self):
+        """This function resumes the scheduler."""
+        self.paused = False
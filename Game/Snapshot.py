@@ -0,0 +1,309 @@
+"""
+A compact, versioned binary snapshot of a game, so a game can be saved every few seconds and
+resumed after the app is closed or killed.
+
+A snapshot is a fixed header followed by the variable length parts of the game:
+
+    header          magic, format version, seed, grid size, scheduler, resources, the start of
+                    the current CO2 rise and flags
+    task timers     the step every scheduler task next runs at, which holds the cooldowns
+    tiles           the tile states, 2 bits each
+    trees           tile indexes, productions as one byte each, readiness as bits and the
+                    game times the trees become ready at
+    random states   the seeds of the engine's and the board's random number generators and how
+                    far each has drawn, so a resumed game rolls exactly as it would have
+    events          the player's inputs so far
+    checksum        the CRC-32 of everything before it, so a damaged file is not loaded
+
+Every number is little-endian.
+"""
+
+# IMPORTS
+import heapq
+import os
+import struct
+import zlib
+
+from Game.Engine import GameState
+
+
+MAGIC = b"nO2S"
+VERSION = 3
+
+HEADER = struct.Struct("<4sBIHHQdd?iididIidQI???B")
+COUNT = struct.Struct("<I")
+STEP = struct.Struct("<Q")
+COUNTED = struct.Struct("<QQ")
+PCG64 = struct.Struct("<16s16s?I")
+CHECKSUM = struct.Struct("<I")
+
+# Kinds of random number generator
+PYTHON_RANDOM = 0
+NUMPY_PCG64 = 1
+
+
+def pack_bits(values, bits):
+    """
+    This function packs small non-negative integers into bytes.
+
+    :param values: the integers
+    :param bits: bits per integer, 1, 2, 4 or 8
+
+    :return packed: the packed bytes
+    """
+    per_byte = 8 // bits
+    packed = bytearray((len(values) + per_byte - 1) // per_byte)
+    for i, value in enumerate(values):
+        packed[i // per_byte] |= int(value) << (i % per_byte * bits)
+    return packed
+
+
+def unpack_bits(data, count, bits):
+    """
+    This function unpacks integers packed by pack_bits().
+
+    :param data: the packed bytes
+    :param count: the number of integers
+    :param bits: bits per integer
+
+    :return: a list of the integers
+    """
+    per_byte = 8 // bits
+    mask = (1 << bits) - 1
+    return [data[i // per_byte] >> (i % per_byte * bits) & mask for i in range(count)]
+
+
+def check_length(data, end):
+    """
+    This function checks a snapshot is long enough to hold the part being read.
+
+    :param data: the snapshot
+    :param end: where the part ends
+
+    :raises ValueError: if the snapshot is shorter
+    """
+    if len(data) < end:
+        raise ValueError("Snapshot is truncated")
+
+
+def pack_rng(rng):
+    """
+    This function packs the state of a CountingRandom, as its seed and the number of words it
+    has drawn, or of a numpy Generator.
+
+    :param rng: the random number generator
+
+    :return: the packed state
+    """
+    if hasattr(rng, "words"):
+        return bytes([PYTHON_RANDOM]) + COUNTED.pack(rng.seed_value, rng.words)
+
+    state = rng.bit_generator.state
+    return bytes([NUMPY_PCG64]) + PCG64.pack(state["state"]["state"].to_bytes(16, "little"),
+                                             state["state"]["inc"].to_bytes(16, "little"),
+                                             state["has_uint32"], state["uinteger"])
+
+
+def unpack_rng(rng, data, position):
+    """
+    This function restores the state of a random number generator packed by pack_rng().
+
+    :param rng: the random number generator to restore, of the same kind as the packed one
+    :param data: the snapshot
+    :param position: where the packed state starts
+
+    :return position: where the data after the packed state starts
+    """
+    check_length(data, position + 1)
+    kind = data[position]
+    position += 1
+
+    if kind != (PYTHON_RANDOM if hasattr(rng, "words") else NUMPY_PCG64):
+        raise ValueError("Snapshot was taken with a different kind of board")
+
+    if kind == PYTHON_RANDOM:
+        seed, words = COUNTED.unpack_from(data, position)
+        rng.seed(seed)
+        rng.skip(words)
+        return position + COUNTED.size
+
+    if kind == NUMPY_PCG64:
+        state, inc, has_uint32, uinteger = PCG64.unpack_from(data, position)
+        rng.bit_generator.state = {
+            "bit_generator": "PCG64",
+            "state": {"state": int.from_bytes(state, "little"), "inc": int.from_bytes(inc, "little")},
+            "has_uint32": int(has_uint32),
+            "uinteger": uinteger
+        }
+        return position + PCG64.size
+
+    raise ValueError(f"Unknown random number generator {kind} in snapshot")
+
+
+def save(engine):
+    """
+    This function takes a snapshot of a game.
+
+    :param engine: the Engine running the game
+
+    :return: the snapshot
+    """
+    scheduler = engine.scheduler
+    state = engine.state
+    tasks = list(scheduler.tasks.values())
+    trees = list(engine.trees.values())
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, engine.seed, engine.rows, engine.cols, scheduler.steps,
+                    scheduler.time, scheduler.accumulator, scheduler.paused,
+                    state.oxygen_value, state.oxygen_cap, state.co2_value, state.co2_cap,
+                    state.temperature, state.days, state.score, engine.co2_base, engine.co2_steps,
+                    engine.tree_num, engine.flood_used, engine.reclaim_used, engine.lost, len(tasks)),
+        struct.pack(f"<{len(tasks)}Q", *[task.due for task in tasks]),
+        pack_bits(list(engine.board.tiles), 2),
+        COUNT.pack(len(trees)),
+        struct.pack(f"<{len(trees)}I", *[tree.i for tree in trees]),
+        bytes([tree.production for tree in trees]),
+        pack_bits([tree.is_ready for tree in trees], 1),
+        struct.pack(f"<{len(trees)}d", *[tree.ready_at for tree in trees]),
+        pack_rng(engine.rng),
+        pack_rng(engine.board.rng),
+        STEP.pack(engine.events.last_step),
+        COUNT.pack(len(engine.events.data)),
+        engine.events.data
+    ]
+    data = b"".join(parts)
+    return data + CHECKSUM.pack(zlib.crc32(data))
+
+
+def load(engine, data):
+    """
+    This function restores a game from a snapshot. The engine keeps its board type.
+
+    :param engine: the Engine to restore the game into
+    :param data: the snapshot
+
+    :raises ValueError: if the data is not a snapshot of a version this function can read, or
+                        is damaged
+    """
+    if len(data) < HEADER.size + CHECKSUM.size:
+        raise ValueError("Snapshot is too short")
+
+    (magic, version, seed, rows, cols, steps, time, accumulator, paused, oxygen_value, oxygen_cap,
+     co2_value, co2_cap, temperature, days, score, co2_base, co2_steps, tree_num, flood_used, reclaim_used, lost,
+     task_count) = HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise ValueError("Data is not a snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+
+    checksum, = CHECKSUM.unpack_from(data, len(data) - CHECKSUM.size)
+    data = data[:-CHECKSUM.size]
+    if zlib.crc32(data) != checksum:
+        raise ValueError("Snapshot is damaged")
+
+    position = HEADER.size
+    due = struct.unpack_from(f"<{task_count}Q", data, position)
+    position += 8 * task_count
+
+    tile_count = rows * cols
+    check_length(data, position + (tile_count + 3) // 4)
+    tiles = unpack_bits(data[position:position + (tile_count + 3) // 4], tile_count, 2)
+    position += (tile_count + 3) // 4
+
+    tree_count, = COUNT.unpack_from(data, position)
+    position += COUNT.size
+    indexes = struct.unpack_from(f"<{tree_count}I", data, position)
+    position += 4 * tree_count
+    check_length(data, position + tree_count + (tree_count + 7) // 8)
+    productions = data[position:position + tree_count]
+    position += tree_count
+    ready = unpack_bits(data[position:position + (tree_count + 7) // 8], tree_count, 1)
+    position += (tree_count + 7) // 8
+    ready_at = struct.unpack_from(f"<{tree_count}d", data, position)
+    position += 8 * tree_count
+
+    # Start from a fresh game of the right size, then overwrite its state
+    engine.rows = rows
+    engine.cols = cols
+    engine.reset(seed)
+    engine.board = engine.board_type(tiles, rows, cols, seed=seed)
+    position = unpack_rng(engine.rng, data, position)
+    position = unpack_rng(engine.board.rng, data, position)
+
+    last_step, = STEP.unpack_from(data, position)
+    position += STEP.size
+    length, = COUNT.unpack_from(data, position)
+    position += COUNT.size
+    check_length(data, position + length)
+    engine.events.data = bytearray(data[position:position + length])
+    engine.events.last_step = last_step
+
+    scheduler = engine.scheduler
+    scheduler.steps = steps
+    scheduler.time = time
+    scheduler.accumulator = accumulator
+    scheduler.paused = paused
+    for task, task_due in zip(scheduler.tasks.values(), due):
+        task.due = task_due
+
+    engine.state = GameState(oxygen_value, oxygen_cap, co2_value, co2_cap, temperature, days, score)
+    engine.co2_base = co2_base
+    engine.co2_steps = co2_steps
+
+    engine.trees = {}
+    engine.tree_timers = []
+    for i, production, is_ready, tree_ready_at in zip(indexes, productions, ready, ready_at):
+        tree = engine.tree_type(i)
+        tree.production = production
+        tree.is_ready = bool(is_ready)
+        tree.ready_at = tree_ready_at
+        engine.trees[i] = tree
+        if not tree.is_ready:
+            heapq.heappush(engine.tree_timers, (tree_ready_at, next(engine.tree_order), tree))
+
+    engine.tree_num = tree_num
+    engine.calculate_tree_price()
+    engine.flood_used = flood_used
+    engine.reclaim_used = reclaim_used
+    engine.lost = lost
+    engine.dirty = set(range(len(engine.board)))
+
+
+def write(engine, path):
+    """
+    This function saves a snapshot of a game to a file. The file is replaced in one step, so a
+    snapshot interrupted while being written does not overwrite the previous one.
+
+    :param engine: the Engine running the game
+    :param path: the file to save to
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(save(engine))
+    os.replace(temporary, path)
+
+
+def read(engine, path):
+    """
+    This function restores a game from a snapshot file.
+
+    :param engine: the Engine to restore the game into
+    :param path: the file to restore from
+
+    :return: True if the game was restored, False if there is no readable snapshot
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return False
+
+    try:
+        load(engine, data)
+    except (ValueError, struct.error):
+        engine.reset()
+        return False
+
+    return True
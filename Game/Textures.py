@@ -0,0 +1,46 @@
+"""
+The game screen's images, packed into a single texture atlas so that drawing the grid does not
+switch between textures.
+
+The atlas (Game/Assets/game.atlas and game-0.png) is built from the images in Game/Assets. After
+changing any of them, rebuild it by running this file from the root directory:
+
+    python -m Game.Textures
+
+If the atlas is missing, the images are loaded from their own files instead.
+"""
+
+# IMPORTS
+from functools import lru_cache
+import os
+
+
+# Images drawn on the game screen
+ATLAS = "Game/Assets/game"
+IMAGES = ["grass", "grass_pressed", "water", "oak_tree", "oxygen_bubble", "co2_cloud", "sun"]
+ATLAS_SIZE = 1024
+
+
+@lru_cache(maxsize=None)
+def image(name):
+    """
+    This function finds the source of one of the game screen's images.
+
+    :param name: the image's file name in Game/Assets, without the extension
+
+    :return: the image's atlas url if the atlas has been built, otherwise its file path
+    """
+    if name in IMAGES and os.path.exists(ATLAS + ".atlas"):
+        return f"atlas://{ATLAS}/{name}"
+    return f"Game/Assets/{name}.png"
+
+
+def build_atlas():
+    """This function packs the game screen's images into the atlas."""
+    from kivy.atlas import Atlas
+
+    Atlas.create(ATLAS, [f"Game/Assets/{name}.png" for name in IMAGES], ATLAS_SIZE)
+
+
+if __name__ == "__main__":
+    build_atlas()
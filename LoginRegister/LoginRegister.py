@@ -4,18 +4,37 @@
 import re
 from datetime import datetime
 import requests
-import socket
 import sys
 
-from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.button import Button
-from kivy.uix.label import Label
-from kivy.properties import ObjectProperty
+from kivy.app import App
+from kivy.properties import ObjectProperty, BooleanProperty
 from kivy.clock import Clock
 from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import Screen, FadeTransition
 from kivymd.uix.dialog import MDDialog
 
+from Backend.Client import backend, device_ip
+from Backend.RequestPool import background
+
+
+NO_CONNECTION = "The server cannot be reached, please try again later"
+
+
+class MessagePopup(Popup):
+    """
+    This class builds the popup used to tell the user why they could not log in or register,
+    defined inside loginregister.kv. It is built once and reopened with a new message, so that
+    it opens within a frame.
+    """
+    def show(self, message):
+        """
+        This function opens the popup.
+
+        :param message: the message to show
+        """
+        self.message = message
+        self.open()
+
 
 class Register(Screen):
     """
@@ -41,6 +60,11 @@ class Register(Screen):
                 Warning message to tell the user what is wrong with password they entered
     confirm_password_warning: ObjectProperty
                 Warning message to tell the user that the passwords do not match
+    message_popup: MessagePopup
+                The popup displayed when the server cannot be reached
+    busy: BooleanProperty
+                True while the details are being checked with the server, which disables the
+                register button
     """
     email = ObjectProperty(None)
     username = ObjectProperty(None)
@@ -50,34 +74,29 @@ class Register(Screen):
     username_warning = ObjectProperty(None)
     password_warning = ObjectProperty(None)
     confirm_password_warning = ObjectProperty(None)
+    busy = BooleanProperty(False)
 
     def __init__(self, **kwargs):
         Screen.__init__(self, **kwargs)
 
         self.errors = [False,False,False,False]
         self.warnings = [self.email_warning,self.username_warning,self.password_warning,self.confirm_password_warning]
-    def validate(self):
+        self.message_popup = MessagePopup()
+
+    def validate(self, taken=()):
         """
         This function is the registration form's input validation.
+        :param taken: the fields the server found already registered, "email" and/or "username"
         :return validated: A boolean value that is true if all validation checks have been
                            completed successfully.
         """
         # Refresh any previous errors
         self.refresh_errors()
 
-        # Get all users and emails to check if either already exists
-        users = requests.get("https://no2project.herokuapp.com/backend_api/no2_backend/users").json()
-        emails = []
-        usernames = []
-
-        for user in users:
-            emails.append(user['email'])
-            usernames.append(user['username'])
-
         email_regex = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
 
         # If email exists
-        if self.email.text in emails:
+        if "email" in taken:
             self.email_warning.text = "This email is already registered"
             self.errors[0] = True
             self.email.text = ""
@@ -90,12 +109,12 @@ class Register(Screen):
             self.email.text = ""
 
         # If username exists
-        if self.username.text in usernames:
+        if "username" in taken:
             self.username_warning.text = "This username is taken"
             self.errors[1] = True
             self.username.text = ""
 
-        if any(not c.isalnum() for c in self.username.text):
+        elif any(not c.isalnum() for c in self.username.text):
             self.username_warning.text = "Username may only contain alphanumeric characters"
             self.errors[1] = True
             self.username.text = ""
@@ -146,61 +165,89 @@ class Register(Screen):
         self.confirm_password_warning.text = ""
 
     def register(self):
-        """This function creates a new user if validate() returns true."""
-        if self.validate():
-            # Create new user row
-            new_user = {
-                "username": self.username.text.strip(),
-                "role": "user",
-                "email": self.email.text.strip(),
-                "password": self.password.text.strip(),
-                "registered_on": datetime.now(),
-                "last_logged_in": datetime.now(),
-                "logged_in": True,
-                "allow_emails": True
-            }
-            # Create new score row for the new user
-            new_score = {
-                "score_username": self.username.text.strip(),
-                "high_score": 0,
-                "date_achieved": datetime(2000, 1, 1),
-                "previous_score": 0,
-                "most_days_lasted": 0,
-                "previous_days_lasted": 0
-            }
-            requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/user', data=new_user)
-            requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/score', data=new_score)
+        """
+        This function creates a new user in the background if validate() returns true. The
+        server checks the email and username are not taken.
+        """
+        if self.busy or not self.validate():
+            return
+
+        # Create new user row
+        new_user = {
+            "username": self.username.text.strip(),
+            "role": "user",
+            "email": self.email.text.strip(),
+            "password": self.password.text.strip(),
+            "registered_on": datetime.now(),
+            "last_logged_in": datetime.now(),
+            "logged_in": True,
+            "allow_emails": True
+        }
+        # Create new score row for the new user
+        new_score = {
+            "score_username": self.username.text.strip(),
+            "high_score": 0,
+            "date_achieved": datetime(2000, 1, 1),
+            "previous_score": 0,
+            "most_days_lasted": 0,
+            "previous_days_lasted": 0
+        }
+
+        self.busy = True
+        background.submit(backend.register, new_user, new_score,
+                          on_success=self.registered, on_error=self.request_failed)
 
-            score = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username.text.strip()}/score').json()
+    def request_failed(self, error):
+        """
+        This function tells the user the server cannot be reached.
 
-            # Place the user's information in the account screen
-            self.manager.account_screen.username = score["score_username"]
-            self.manager.account_screen.high_score = score["high_score"]
-            self.manager.account_screen.most_days = score["most_days_lasted"]
-            self.manager.account_screen.previous_score = score["previous_score"]
-            self.manager.account_screen.previous_days = score["previous_days_lasted"]
-            self.manager.account_screen.emails = True
+        :param error: the exception the request raised
+        """
+        self.busy = False
+        if not isinstance(error, requests.RequestException):
+            raise error
+        self.message_popup.show(NO_CONNECTION)
 
-            # Log user registration
-            hostname = socket.gethostname()
+    def registered(self, result):
+        """
+        This function signs the new user in once they are created, or shows which details are
+        already registered.
+
+        :param result: the server's answer, see BackendClient.register()
+        """
+        self.busy = False
+        if "taken" in result:
+            self.validate(result["taken"])
+            return
+
+        new_score = result["score"]
+        store = App.get_running_app().store
+
+        # Place the user's information in the account screen
+        self.manager.account_screen.user = result["user"]
+        self.manager.account_screen.set_score(new_score)
+        self.manager.account_screen.emails = True
+
+        # Log user registration, unless the server already has
+        if not result["logged"]:
             new_log = {
-                "username": score["score_username"],
+                "username": new_score["score_username"],
                 "time_occurred": datetime.now(),
                 "warning_desc": "user registration and login",
-                "ip": socket.gethostbyname(hostname)
+                "ip": device_ip()
             }
 
-            requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/log', data=new_log)
+            store.create_log(new_log)
 
-            # Clear the registration screen
-            self.email.text = ""
-            self.username.text = ""
-            self.password.text = ""
-            self.confirm_password.text = ""
+        # Clear the registration screen
+        self.email.text = ""
+        self.username.text = ""
+        self.password.text = ""
+        self.confirm_password.text = ""
 
-            # Go to account screen
-            self.manager.transition = FadeTransition(duration=0.5)
-            self.manager.current = "Account"
+        # Go to account screen
+        self.manager.transition = FadeTransition(duration=0.5)
+        self.manager.current = "Account"
 
 class Login(Screen):
     """
@@ -213,82 +260,113 @@ class Login(Screen):
                   The password entered by the user inside the TextField.
     timeout_counter: Integer
                   A counter that causes a timeout if the user fails login thrice in a row.
+    message_popup: MessagePopup
+                  The popup displayed when a login fails.
+    busy: BooleanProperty
+                  True while the credentials are being checked with the server, which disables
+                  the login button
     """
     username = ObjectProperty(None)
     password = ObjectProperty(None)
+    busy = BooleanProperty(False)
 
     def __init__(self, **kwargs):
         Screen.__init__(self, **kwargs)
         self.timeout_counter = 1
+        self.message_popup = MessagePopup()
 
     def login(self):
-        """
-        This function checks the user's credentials and logs them in if they find a match in the
-        database.
-        Regular users are sent to the account page, the admin is sent to the admin page afterwards.
-        If they fail to provide correct credentials 3 times, they are timed out for 60 seconds.
-        """
+        """This function checks the user's credentials with the server in the background."""
+        if self.busy:
+            return
+
         # Data to validate
         auth_data = {
             "username": self.username.text.strip(),
             "password": self.password.text.strip()
         }
 
-        # Check if user exists and their role
-        auth = requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/auth/user', data=auth_data).json()
+        # Check if user exists and their role, and get their details if they do
+        self.busy = True
+        background.submit(backend.login, auth_data, on_success=self.authenticate, on_error=self.request_failed)
+
+    def request_failed(self, error):
+        """
+        This function tells the user the server cannot be reached.
+
+        :param error: the exception the request raised
+        """
+        self.busy = False
+        self.password.text = ""
+        if not isinstance(error, requests.RequestException):
+            raise error
+        self.message_popup.show(NO_CONNECTION)
+
+    def authenticate(self, result):
+        """
+        This function logs the user in if their credentials found a match in the database.
+        Regular users are sent to the account page, the admin is sent to the admin page afterwards.
+        If they fail to provide correct credentials 3 times, they are timed out for 60 seconds.
+
+        :param result: the server's answer, see BackendClient.login()
+        """
+        self.busy = False
+        auth = result["auth"]
 
         # If user exists
         if auth == "Admin" or auth is True:
             # Reset login attempts
             self.timeout_counter = 1
 
-            # Update user's logged_in status to True
-            current_user = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username.text.strip()}/user').json()
-
-            updated_user = {
-                "username": current_user["username"],
-                "role": current_user["role"],
-                "email": current_user["email"],
-                "password": current_user["password"],
-                "registered_on": current_user["registered_on"],
-                "last_logged_in": current_user["last_logged_in"],
-                "logged_in": True,
-                "allow_emails": current_user["allow_emails"]
-            }
+            current_user = result["user"]
+            store = App.get_running_app().store
 
-            requests.put(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username.text.strip()}/update/user', data=updated_user).json()
+            if result["logged"]:
+                self.manager.account_screen.user = current_user
+            else:
+                # Update user's logged_in status to True
+                updated_user = {
+                    "username": current_user["username"],
+                    "role": current_user["role"],
+                    "email": current_user["email"],
+                    "password": current_user["password"],
+                    "registered_on": current_user["registered_on"],
+                    "last_logged_in": current_user["last_logged_in"],
+                    "logged_in": True,
+                    "allow_emails": current_user["allow_emails"]
+                }
+
+                # Sent in the background, the user does not need to wait for it
+                store.update_user(current_user["username"], updated_user)
+                self.manager.account_screen.user = updated_user
 
             # If user is a regular user
             if auth is True:
                 # Place information in account screen
-                score = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username.text.strip()}/score').json()
+                score = result["score"]
 
-                self.manager.account_screen.username = score["score_username"]
-                self.manager.account_screen.high_score = score["high_score"]
-                self.manager.account_screen.most_days = score["most_days_lasted"]
-                self.manager.account_screen.previous_score = score["previous_score"]
-                self.manager.account_screen.previous_days = score["previous_days_lasted"]
+                self.manager.account_screen.set_score(score)
                 self.manager.account_screen.emails = current_user["allow_emails"]
 
                 # Go to account screen
                 self.manager.transition = FadeTransition(duration=0.5)
                 self.manager.current = "Account"
 
-                # Log login
-                hostname = socket.gethostname()
-                new_log = {
-                    "username": score["score_username"],
-                    "time_occurred": datetime.now(),
-                    "warning_desc": "user login",
-                    "ip": socket.gethostbyname(hostname)
-                }
+                # Log login, unless the server already has
+                if not result["logged"]:
+                    new_log = {
+                        "username": score["score_username"],
+                        "time_occurred": datetime.now(),
+                        "warning_desc": "user login",
+                        "ip": device_ip()
+                    }
 
-                requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/log', data=new_log)
+                    store.create_log(new_log)
 
             # If user is an admin
             elif auth == "Admin":
                 # Place admin's username in account screen
-                admin = requests.get(f'https://no2project.herokuapp.com/backend_api/no2_backend/{self.username.text.strip()}/user').json()
+                admin = current_user
 
                 self.manager.account_screen.username = admin["username"]
 
@@ -296,16 +374,16 @@ class Login(Screen):
                 self.manager.transition = FadeTransition(duration=0.5)
                 self.manager.current = "Admin"
 
-                # Log login
-                hostname = socket.gethostname()
-                new_log = {
-                    "username": admin["username"],
-                    "time_occurred": datetime.now(),
-                    "warning_desc": "admin login",
-                    "ip": socket.gethostbyname(hostname)
-                }
+                # Log login, unless the server already has
+                if not result["logged"]:
+                    new_log = {
+                        "username": admin["username"],
+                        "time_occurred": datetime.now(),
+                        "warning_desc": "admin login",
+                        "ip": device_ip()
+                    }
 
-                requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/log', data=new_log)
+                    store.create_log(new_log)
 
             # Clear password field
             self.password.text = ""
@@ -318,29 +396,18 @@ class Login(Screen):
             # If user has tries left
             if self.timeout_counter < 3:
                 self.timeout_counter += 1
-                auth_failed = Popup(title="",
-                                    size_hint=(0.4, 0.25))
-
-                box = BoxLayout(orientation='vertical')
-                box.add_widget(Label(text="Please check your credentials and try again"))
-                box.add_widget(Button(text="Close",
-                                      size_hint_y=0.4,
-                                      on_release=auth_failed.dismiss))
-
-                auth_failed.add_widget(box)
-                auth_failed.open()
+                self.message_popup.show("Please check your credentials and try again")
             # If user fails to log in within 3 tries
             else:
                 # Log unsuccessful login attempt
-                hostname = socket.gethostname()
                 new_log = {
                     "username": self.password.text.strip(),
                     "time_occurred": datetime.now(),
                     "warning_desc": "unsuccessful login attempt",
-                    "ip": socket.gethostbyname(hostname)
+                    "ip": device_ip()
                 }
 
-                requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/log', data=new_log)
+                App.get_running_app().store.create_log(new_log)
 
                 # Reset timeout counter
                 self.timeout_counter = 1
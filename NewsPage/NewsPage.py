@@ -2,19 +2,23 @@
 # IMPORTS
 from bs4 import BeautifulSoup
 import LinkShortener
-import requests
 from validators import url
 import webbrowser
 import smtplib
 import _thread
 
-from kivy.properties import StringProperty, ObjectProperty, NumericProperty
+from kivy.app import App
+from kivy.clock import mainthread
+from kivy.properties import StringProperty, ObjectProperty, NumericProperty, BooleanProperty
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.uix.screenmanager import Screen
 
+from Backend.Client import backend
+from Backend.RequestPool import background
+
 
 # Sends a notification email to all users
 def send_email_notification(link):
@@ -22,7 +26,7 @@ def send_email_notification(link):
     email_password = "" # TODO: Add password to field
     sent_from = email_user
     # Gets all users from th database
-    users = requests.get("https://no2project.herokuapp.com/backend_api/no2_backend/users").json()
+    users = backend.users()
     # Creates email server to send the notifications
     server = smtplib.SMTP("smtp.gmail.com", 587)
     server.starttls()
@@ -39,6 +43,42 @@ def send_email_notification(link):
     server.close()
 
 
+# Adds an article to the database and returns the message to show the admin, runs in the background
+def create_article(link):
+    exists = False
+    # Shortens URL to a tinyURL to be stored in the database
+    link = LinkShortener.shorten(link)
+    # Checks if article is already stored in the database
+    for article in App.get_running_app().store.rows("articles"):
+        if link == article["link"]:
+            exists = True
+            break
+    if exists:
+        return "Article already in database"
+    try:
+        # Gets HTML for page
+        page = backend.fetch(link)
+        soup = BeautifulSoup(page.content, "html.parser")
+        # Selects title, description and image link from the article and will fail if they cannot be found
+        title = soup.find("meta", property="og:title")["content"]
+        if len(title) > 150:
+            title = title[:145] + "..."
+        desc = soup.find("meta", property="og:description")["content"]
+        if len(desc) > 300:
+            desc = desc[:295] + "..."
+        img = soup.find("meta", property="og:image")["content"]
+        img = LinkShortener.shorten(img)
+        article = {"link": link, "title": title, "desc": desc, "image": img}
+        # Adds article to the database
+        backend.create_article(article)
+    except:
+        return "Failed to add article"
+    # The article list is updated once the new article is downloaded
+    App.get_running_app().store.request_sync("articles")
+    _thread.start_new_thread(send_email_notification,(link,))
+    return "Article added successfully"
+
+
 class Article(ButtonBehavior, GridLayout):
     """Widget to display articles feed, displays an image, title and description, opens webpage when clicked on"""
     id = NumericProperty(0)
@@ -76,50 +116,27 @@ class AddArticlePopup(Popup):
     link_text = ObjectProperty()
     message = ObjectProperty()
     screen = ObjectProperty()
+    busy = BooleanProperty(False)
     pass
 
-    # Adds article to the text document
+    # Adds article to the text document, fetching it in the background
     def add_article(self):
-        self.message.text = ""
+        if self.busy:
+            return
         link = self.link_text.text
         # Checks if the link is a real URL
         if url(link):
-            exists = False
-            # Shortens URL to a tinyURL to be stored in the database
-            link = LinkShortener.shorten(link)
-            # Checks if article is already stored in the database
-            for article in requests.get('https://no2project.herokuapp.com/backend_api/no2_backend/articles').json():
-                if link == article["link"]:
-                    exists = True
-                    break
-            if not exists:
-                try:
-                    # Gets HTML for page
-                    page = requests.get(link)
-                    soup = BeautifulSoup(page.content, "html.parser")
-                    # Selects title, description and image link from the article and will fail if they cannot be found
-                    title = soup.find("meta", property="og:title")["content"]
-                    if len(title) > 150:
-                        title = title[:145] + "..."
-                    desc = soup.find("meta", property="og:description")["content"]
-                    if len(desc) > 300:
-                        desc = desc[:295] + "..."
-                    img = soup.find("meta", property="og:image")["content"]
-                    img = LinkShortener.shorten(img)
-                    article = {"link": link, "title": title, "desc": desc, "image": img}
-                    # Adds article to the database
-                    requests.post('https://no2project.herokuapp.com/backend_api/no2_backend/create/article', data=article).json()
-                except:
-                    self.message.text = "Failed to add article"
-                else:
-                    self.message.text = "Article added successfully"
-                    self.screen.update_article_list()
-                    _thread.start_new_thread(send_email_notification,(link,))
-            else:
-                self.message.text = "Article already in database"
+            self.busy = True
+            self.message.text = "Adding article..."
+            background.submit(create_article, link, on_success=self.show_result)
         else:
             self.message.text = "Invalid URL"
 
+    # Shows whether the article was added
+    def show_result(self, message):
+        self.busy = False
+        self.message.text = message
+
 
 class AdminArticlePopup(Popup):
     """Popup for the admin view of the news page, allows them to remove articles instead of opening them"""
@@ -127,9 +144,9 @@ class AdminArticlePopup(Popup):
     screen = ObjectProperty()
     pass
 
-    # Removes article that was clicked on from the text file
+    # Removes article that was clicked on, on the device straight away and from the database once it can
     def remove_article(self):
-        requests.delete(f'https://no2project.herokuapp.com/backend_api/no2_backend/{str(self.article.id)}/delete/article').json()
+        App.get_running_app().store.delete_article(self.article.id)
         self.screen.update_article_list()
         self.dismiss()
 
@@ -141,15 +158,21 @@ class NewsScreen(Screen):
     is_admin = False
     pass
 
+    def __init__(self, **kwargs):
+        Screen.__init__(self, **kwargs)
+        # Shows the articles again whenever newer ones are downloaded
+        App.get_running_app().store.subscribe("articles", self.update_article_list)
+
     # Displays the pop for adding articles
     def add_article_popup(self):
         popup = AddArticlePopup()
         popup.screen = self
         popup.open()
 
-    # Loads news articles from the db
+    # Loads the news articles on the device and keeps downloading the latest ones while the screen is open
     def load_screen(self):
         self.update_article_list()
+        App.get_running_app().store.watch("articles")
 
     # Disables the admin functionality for the news screen
     def disable_admin_functionality(self):
@@ -164,10 +187,11 @@ class NewsScreen(Screen):
         self.is_admin = True
 
     # Updates the list of articles
-    def update_article_list(self):
+    @mainthread
+    def update_article_list(self, *args):
         self.article_list.clear_widgets()
-        # Get articles from the database
-        articles = requests.get('https://no2project.herokuapp.com/backend_api/no2_backend/articles').json()
+        # Get articles from the device
+        articles = App.get_running_app().store.rows("articles")
         # Reverse the order so the more recent articles added are at the top
         articles.reverse()
         # Creates an article object for each row in the database
@@ -1,6 +1,9 @@
 # IMPORTS
+import os
 import requests
+import threading
 
+from kivy.clock import mainthread
 from kivy.properties import ObjectProperty
 from kivy.uix.screenmanager import ScreenManager
 from kivy.core.window import Window
@@ -14,6 +17,8 @@ from Account.Account import AccountScreen
 from Account.Scoreboard import Scoreboard
 from LoginRegister.LoginRegister import Login, Register
 from AdminPage.Admin import AdminScreen, LogsScreen
+from Backend.Client import backend, device_ip
+from Backend.LocalStore import LocalStore
 
 
 # WINDOW CONFIGURATION
@@ -36,23 +41,58 @@ class Manager(ScreenManager):
 
 
 class WindowManagerApp(MDApp):
-    """The final application."""
+    """
+    The final application.
+
+    Attributes
+    ----------
+    store: LocalStore
+          The copy of the backend's data on the device, which the screens read from.
+    """
+    # Seconds the app waits on closing for the sign out to be sent
+    STOP_TIMEOUT = 3
+
     def build(self):
         self.theme_cls.theme_style = 'Dark'
         self.title = "nO2"
         self.icon = "Game/Assets/oak_tree.png"
 
+        # The screens work from the data on the device, so they are built whether or not the
+        # server can be reached
+        self.store = LocalStore(os.path.join(self.user_data_dir, "no2.db"))
+        threading.Thread(target=self.check_connection, daemon=True).start()
+        return Manager()
+
+    def on_stop(self):
+        """
+        This function saves the game and signs the user out when the app is closed. The game
+        screen is not left then, and the app is gone by the time atexit handlers run.
+        """
+        self.root.game.pause()
+        self.root.account_screen.sign_out()
+        self.store.drain(WindowManagerApp.STOP_TIMEOUT)
+
+    def check_connection(self):
+        """
+        This function warns the user if the server cannot be reached, and finds the device's
+        address for the log entries. It runs in the background.
+        """
+        device_ip()
         try:
-            requests.get("https://no2project.herokuapp.com/backend_api/", timeout=5)
-            return Manager()
-        except (requests.ConnectionError, requests.Timeout) as exception:
-            dialog = MDDialog(
-                    title="No connection",
-                    text="An unexpected error was encountered when trying to connect to the server.",
-                    type="alert",
-                    auto_dismiss=False
-                )
-            dialog.open()
+            backend.health()
+        except (requests.ConnectionError, requests.Timeout):
+            self.show_offline()
+
+    @mainthread
+    def show_offline(self):
+        """This function tells the user the app is offline."""
+        dialog = MDDialog(
+                title="No connection",
+                text="The server cannot be reached. Saved scores, news and logs are shown, and "
+                     "changes will be sent once the connection is back.",
+                type="alert"
+            )
+        dialog.open()
 
 
 if __name__ == "__main__":
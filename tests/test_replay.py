@@ -0,0 +1,50 @@
+"""
+Checks that a game played live is played again exactly from its replay, so the score verifier
+accepts it. Run it from the root directory:
+
+    python -m pytest tests
+"""
+
+# IMPORTS
+from Backend.ScoreVerifier import verify
+from Game.Balance import script_game
+from Game.Engine import Engine, TileBoard
+from Game.EventLog import EventLog
+
+
+def state(engine):
+    """
+    This function sums up a game, to compare a live game with its replay.
+
+    :param engine: the engine running the game
+
+    :return: the game's step, score, days, oxygen, CO2 and board
+    """
+    return (engine.scheduler.steps, engine.state.score, engine.state.days, engine.state.oxygen_value,
+            engine.state.co2_value, [engine.board[i] for i in range(len(engine.board))])
+
+
+def test_purchase_confirmed_after_flood():
+    """The player opens the purchase popup on a grass tile, which floods before they confirm."""
+    engine = Engine(seed=0)
+    i = 11
+    assert engine.board[i] == TileBoard.GRASS
+
+    while engine.board[i] == TileBoard.GRASS:
+        engine.scheduler.run(100)
+        for tree in list(engine.trees.values()):
+            if tree.is_ready:
+                engine.collect_oxygen(tree)
+    assert engine.state.oxygen_value >= engine.tree_price
+
+    assert not engine.purchase_tree(i)
+    assert engine.board[i] != TileBoard.TREE
+
+    script_game(engine, 0, 10000, 5)
+    assert engine.lost
+
+    replayed = Engine()
+    replayed.replay(EventLog.from_bytes(engine.events.to_bytes()), engine.scheduler.steps)
+    assert state(replayed) == state(engine)
+
+    assert verify(engine.events.to_bytes(), engine.scheduler.steps, engine.state.score, engine.state.days) is None